@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 from urllib.parse import quote_plus
@@ -8,13 +9,28 @@ from urllib.parse import quote_plus
 import pandas as pd
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from scripts.logging_utils import setup_logger
 
+try:
+    # Optional: columnar fetch path (pyarrow ships with streamlit).
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None  # type: ignore
+
 LOGGER = setup_logger(__name__, "db_connector")
 
+# Rows pulled per fetchmany() round-trip when building Arrow batches.
+FETCH_BATCH_SIZE = 50_000
+
+# One pooled engine per (database, isolation level) for the whole process, so
+# repeated connectors reuse logged-in connections instead of re-handshaking.
+_ENGINES: dict[tuple[str, str | None], Engine] = {}
 
+
+@lru_cache(maxsize=1)
 def _configure_odbc_ini_for_homebrew_macos() -> None:
-    """Ensure unixODBC config is discoverable on macOS."""
+    """Ensure unixODBC config is discoverable on macOS (runs once per process)."""
     if os.name != "posix":
         return
     try:
@@ -34,43 +50,113 @@ def _configure_odbc_ini_for_homebrew_macos() -> None:
     os.environ.setdefault("ODBCINI", str(etc_dir / "odbc.ini"))
 
 
+@lru_cache(maxsize=1)
+def _load_db_env() -> dict[str, str]:
+    """Load .env and resolve DB settings once per process."""
+    load_dotenv()
+    return {
+        "server": os.getenv("DB_SERVER", ""),
+        "username": os.getenv("DB_USERNAME", "") or os.getenv("DB_USER", ""),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "driver": os.getenv("ODBC_DRIVER_VERSION", "ODBC Driver 18 for SQL Server"),
+    }
+
+
+def get_engine(database: str = "LMSMaster", *, isolation_level: str | None = None) -> Engine:
+    """Return the process-wide pooled engine for `database`, creating it on first use."""
+    key = (database, isolation_level)
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    _configure_odbc_ini_for_homebrew_macos()
+    env = _load_db_env()
+    server = env["server"]
+    username = env["username"]
+    password = env["password"]
+    driver = env["driver"]
+
+    if not server or not username or not password:
+        raise ValueError(
+            "Missing DB credentials. Set DB_SERVER, DB_USERNAME (or DB_USER), and DB_PASSWORD in .env."
+        )
+
+    conn_str = (
+        f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};UID={username};PWD={password};"
+        "TrustServerCertificate=yes"
+    )
+    LOGGER.info("Initializing DB engine for database=%s driver=%s", database, driver)
+    odbc_connect = quote_plus(conn_str)
+    engine_kwargs: dict[str, Any] = {}
+    if isolation_level:
+        engine_kwargs["isolation_level"] = isolation_level
+    engine = create_engine(
+        f"mssql+pyodbc:///?odbc_connect={odbc_connect}",
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        fast_executemany=True,
+        **engine_kwargs,
+    )
+    _ENGINES[key] = engine
+    return engine
+
+
 class ConnectToLMSMaster:
     """
     DB connector mirroring the referenced alert pipeline pattern:
-    - Build SQLAlchemy+pyodbc engine from .env
+    - Reuse a pooled SQLAlchemy+pyodbc engine built from .env
     - Execute stored procedures with positional params
     - Return all result sets as pandas DataFrames
     """
 
-    def __init__(self, database: str = "LMSMaster") -> None:
-        load_dotenv()
-        _configure_odbc_ini_for_homebrew_macos()
-
-        server = os.getenv("DB_SERVER", "")
-        username = os.getenv("DB_USERNAME", "") or os.getenv("DB_USER", "")
-        password = os.getenv("DB_PASSWORD", "")
-        driver = os.getenv("ODBC_DRIVER_VERSION", "ODBC Driver 18 for SQL Server")
+    def __init__(self, database: str = "LMSMaster", use_arrow: bool = True) -> None:
+        self.engine = get_engine(database)
+        self.use_arrow = use_arrow and pa is not None
 
-        if not server or not username or not password:
-            raise ValueError(
-                "Missing DB credentials. Set DB_SERVER, DB_USERNAME (or DB_USER), and DB_PASSWORD in .env."
-            )
+    @staticmethod
+    def _frame_from_cursor(cursor, use_arrow: bool = True) -> pd.DataFrame:
+        """
+        Build a DataFrame from the cursor's current result set.
+        Arrow path: fetch in batches into columnar Arrow tables, then convert once
+        (avoids holding every row as a Python tuple before pandas rebuilds it).
+        """
+        cols = [c[0] for c in cursor.description]
+        if not use_arrow or pa is None:
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=cols)
 
-        conn_str = (
-            f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};UID={username};PWD={password};"
-            "TrustServerCertificate=yes"
-        )
-        LOGGER.info("Initializing DB engine for database=%s driver=%s", database, driver)
-        odbc_connect = quote_plus(conn_str)
-        self.engine = create_engine(f"mssql+pyodbc:///?odbc_connect={odbc_connect}")
+        tables = []
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            try:
+                tables.append(pa.table([pa.array(values) for values in zip(*rows)], names=cols))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed-type column (e.g. int + str, Decimal + float): Arrow cannot type it,
+                # so load this whole result set row-wise as the non-Arrow path does.
+                records = [rec for t in tables for rec in zip(*(c.to_pylist() for c in t.columns))]
+                records.extend(rows)
+                records.extend(cursor.fetchall())
+                return pd.DataFrame.from_records(records, columns=cols)
+        if not tables:
+            return pd.DataFrame(columns=cols)
 
-    @staticmethod
-    def _yield_result_sets(cursor):
+        try:
+            # Batches can disagree on all-NULL columns (null vs typed); unify first.
+            schema = pa.unify_schemas([t.schema for t in tables])
+            table = pa.concat_tables([t.cast(schema) for t in tables])
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pd.concat([t.to_pandas() for t in tables], ignore_index=True)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    @classmethod
+    def _yield_result_sets(cls, cursor, use_arrow: bool = True):
         while True:
             if cursor.description:
-                cols = [c[0] for c in cursor.description]
-                rows = cursor.fetchall()
-                yield pd.DataFrame.from_records(rows, columns=cols)
+                yield cls._frame_from_cursor(cursor, use_arrow=use_arrow)
             if not cursor.nextset():
                 break
 
@@ -85,7 +171,7 @@ class ConnectToLMSMaster:
         try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            result_sets = list(self._yield_result_sets(cursor))
+            result_sets = list(self._yield_result_sets(cursor, use_arrow=self.use_arrow))
             LOGGER.info("Stored procedure returned %d result set(s)", len(result_sets))
             return result_sets
         finally:
@@ -103,9 +189,7 @@ class ConnectToLMSMaster:
             if not cursor.description:
                 LOGGER.info("Query returned no tabular result.")
                 return pd.DataFrame()
-            cols = [c[0] for c in cursor.description]
-            rows = cursor.fetchall()
-            out = pd.DataFrame.from_records(rows, columns=cols)
+            out = self._frame_from_cursor(cursor, use_arrow=self.use_arrow)
             LOGGER.info("Query returned %d row(s)", len(out))
             return out
         finally:
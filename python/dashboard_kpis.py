@@ -7,9 +7,11 @@ Usage:
   streamlit run python/dashboard_kpis.py
 """
 
+from functools import lru_cache
 from pathlib import Path
 import sys
 from time import time
+from typing import Callable
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
@@ -19,6 +21,7 @@ import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 from scripts.controller import kpi_registry_metrics
+from scripts.frame_io import latest_frame_path, read_frame_file
 
 # Streamlit requires set_page_config to be the first Streamlit call.
 # In some hot-reload paths, it may already be set; avoid crashing.
@@ -28,51 +31,65 @@ except Exception:
     pass
 
 BASE_DIR = Path(__file__).resolve().parents[1]
+REFRESH_DIR = BASE_DIR / "data" / "refresh"
+COMPARE_XLSX = REFRESH_DIR / "kpi_compare.xlsx"
+KPI_METRICS_PATH = REFRESH_DIR / "kpi_metrics.parquet"
+DAILY_METRICS_PATH = REFRESH_DIR / "kpi_daily_metrics.parquet"
+
+
+# Columns the single-metric serving/history loaders actually use.
+METRIC_LOADER_COLS = ("metric_key", "window_days", "as_of_date", "value", "status")
+# Legacy daily metrics: count columns are summed, the rest averaged.
+LEGACY_SUM_COLS = ("Seen", "Scored", "Accepted", "Originated", "Bids", "LoansFunded")
+LEGACY_AVG_COLS = ("BidRate", "WinRate", "ScoringRate", "AcceptRate", "ConvRate", "ScoringCost", "BidCost")
+
+
+@st.cache_data(show_spinner=False)
+def _read_file_cached(path_str: str, mtime_ns: int, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """
+    Parse a refresh file once per version; `mtime_ns` is only part of the cache
+    key so widget reruns reuse the parsed frame until the file is rewritten.
+    """
+    path = Path(path_str)
+    if path.suffix == ".xlsx":
+        return pd.read_excel(path)
+    return read_frame_file(path, columns)
+
+
+def _read_file(path: Path | None, columns: tuple[str, ...] | None = None) -> pd.DataFrame | None:
+    if path is None or not path.exists():
+        return None
+    return _read_file_cached(str(path), path.stat().st_mtime_ns, columns)
+
+
+def _read_refresh_frame(name: str, columns: tuple[str, ...] | None = None) -> pd.DataFrame | None:
+    """Newest Parquet/CSV copy of data/refresh/<name>, or None if missing."""
+    return _read_file(latest_frame_path(REFRESH_DIR / name), columns)
+
+
+_ALERT_ICONS = {"green": "🟢", "yellow": "🟡", "red": "🔴", "grey": "⚫", "gray": "⚫"}
+_UNKNOWN_ICON = "⚪"
 
 
 def _alert_icon(alert: str) -> str:
-    a = (alert or "").strip().lower()
-    if a == "green":
-        return "🟢"
-    if a == "yellow":
-        return "🟡"
-    if a == "red":
-        return "🔴"
-    if a in {"grey", "gray"}:
-        return "⚫"
-    return "⚪"
-
-
-def _alert_rank(alert: str) -> int:
-    """Lower is worse (used for sorting)."""
-    a = (alert or "").strip().lower()
-    if a == "red":
-        return 0
-    if a == "yellow":
-        return 1
-    if a == "green":
-        return 2
-    return 99
+    return _ALERT_ICONS.get((alert or "").strip().lower(), _UNKNOWN_ICON)
+
+
+_BADGE_CLASSES = {
+    "red": ("badge badge-red", "Red"),
+    "yellow": ("badge badge-yellow", "Yellow"),
+    "green": ("badge badge-green", "Green"),
+    "grey": ("badge badge-grey", "Grey"),
+    "gray": ("badge badge-grey", "Grey"),
+}
+_BADGES = {
+    key: f'<span class="{cls}">{_ALERT_ICONS[key]}&nbsp;{label}</span>' for key, (cls, label) in _BADGE_CLASSES.items()
+}
+_UNKNOWN_BADGE = f'<span class="badge">{_UNKNOWN_ICON}&nbsp;Unknown</span>'
 
 
 def _badge_html(alert: str) -> str:
-    a = (alert or "").strip().lower()
-    if a == "red":
-        cls = "badge badge-red"
-        label = "Red"
-    elif a == "yellow":
-        cls = "badge badge-yellow"
-        label = "Yellow"
-    elif a == "green":
-        cls = "badge badge-green"
-        label = "Green"
-    elif a in {"grey", "gray"}:
-        cls = "badge badge-grey"
-        label = "Grey"
-    else:
-        cls = "badge"
-        label = "Unknown"
-    return f'<span class="{cls}">{_alert_icon(alert)}&nbsp;{label}</span>'
+    return _BADGES.get((alert or "").strip().lower(), _UNKNOWN_BADGE)
 
 
 def _status_html(alert: str | None) -> str:
@@ -81,13 +98,19 @@ def _status_html(alert: str | None) -> str:
     return _badge_html(alert)
 
 
+_INDENT_CACHE = tuple("&nbsp;" * (4 * level) for level in range(4))
+
+
 def _metric_html(
     metric: str,
     indent_level: int = 0,
     is_category: bool = False,
     is_headline: bool = False,
 ) -> str:
-    indent = "&nbsp;" * (4 * indent_level)
+    if 0 <= indent_level < len(_INDENT_CACHE):
+        indent = _INDENT_CACHE[indent_level]
+    else:
+        indent = "&nbsp;" * (4 * indent_level)
     if is_headline or is_category:
         cls = "kpi-headline"
     else:
@@ -95,84 +118,62 @@ def _metric_html(
     return f'<span class="{cls}">{indent}{_escape_html(metric)}</span>'
 
 
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})
+
+
 def _escape_html(text: str) -> str:
-    return (
-        str(text)
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&#39;")
-    )
+    # One translate() pass instead of a chain of replace() copies.
+    return str(text).translate(_HTML_ESCAPES)
+
+
+_LINK_OPEN = '<a href="'
+_LINK_CLOSE = '" target="_blank" rel="noopener noreferrer" title="Open in a new tab">Open&nbsp;<span aria-hidden="true">↗</span></a>'
 
 
 def _link_html(url: str) -> str:
     u = (url or "").strip()
     if not u:
         return '<span class="kpi-muted">—</span>'
-    safe = _escape_html(u)
-    return (
-        f'<a href="{safe}" target="_blank" rel="noopener noreferrer" '
-        f'title="Open in a new tab">Open&nbsp;<span aria-hidden="true">↗</span></a>'
-    )
+    return _LINK_OPEN + _escape_html(u) + _LINK_CLOSE
 
 
+@st.cache_data(show_spinner=False)
 def _sample_metrics() -> pd.DataFrame:
     # Showcase-only data. Replace with real computed KPIs later.
-    rows = [
-        {
-            "Group": "Sales",
-            "Metric": "Apps through the door",
-            "Value": "54",
-            "Alert": "Green",
-            "Link": None,
-        },
-        {
-            "Group": "Sales",
-            "Metric": "Accept Count",
-            "Value": "18",
-            "Alert": "Green",
-            "Link": None,
-        },
-        {
-            "Group": "Sales",
-            "Metric": "Accept Rate",
-            "Value": "33.33%",
-            "Alert": "Green",
-            "Link": None,
-        },
+    # Built column-wise so pandas skips the per-row dict parsing.
+    ach_link = "https://reports.speedyloan.com/single/?appid=f9a3184e-f3e8-4fab-94fa-373a0f869114&obj=36bfd39d-16a2-4b83-88a1-0a5fdb7f7f72&theme=sense&bookmark=06cc43dc-cb1b-4466-b0a3-d60246ef27cf&opt=ctxmenu,currsel"
+    return pd.DataFrame(
         {
-            "Group": "Sales",
-            "Metric": "Originated Count",
-            "Value": "0",
-            "Alert": "Red",
-            "Link": None,
-        },
-        {
-            "Group": "Performance",
-            "Metric": "ACH Return Rate",
-            "Value": "17.89%",
-            "Alert": "Green",
-            "Link": "https://reports.speedyloan.com/single/?appid=f9a3184e-f3e8-4fab-94fa-373a0f869114&obj=36bfd39d-16a2-4b83-88a1-0a5fdb7f7f72&theme=sense&bookmark=06cc43dc-cb1b-4466-b0a3-d60246ef27cf&opt=ctxmenu,currsel",
-        },
-        {
-            "Group": "Performance",
-            "Metric": "FPDFA / AA%",
-            "Value": "18.56%",
-            "Alert": "Yellow",
-            "Link": None,
-        },
-        {
-            "Group": "Performance",
-            "Metric": "Payin",
-            "Value": "0.95",
-            "Alert": "Red",
-            "Link": None,
-        },
-    ]
-    df = pd.DataFrame(rows)
-    df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-    return df
+            "Group": ["Sales", "Sales", "Sales", "Sales", "Performance", "Performance", "Performance"],
+            "Metric": [
+                "Apps through the door",
+                "Accept Count",
+                "Accept Rate",
+                "Originated Count",
+                "ACH Return Rate",
+                "FPDFA / AA%",
+                "Payin",
+            ],
+            "Value": ["54", "18", "33.33%", "0", "17.89%", "18.56%", "0.95"],
+            "Alert": ["Green", "Green", "Green", "Red", "Green", "Yellow", "Red"],
+            "Link": [None, None, None, None, ach_link, None, None],
+        }
+    )
+
+
+def _read_kpi_metrics() -> pd.DataFrame | None:
+    """Shared (cached) read of kpi_metrics for both the feed and aggregated loaders."""
+    return _read_refresh_frame("kpi_metrics.parquet")
+
+
+# Columns the dashboard needs from a row-based KPI feed.
+KPI_FEED_COLS = frozenset({"Group", "Metric", "Value", "Alert", "Link"})
+
+# Normalize metric labels (primarily Sales group, based on your MVP ask).
+_RENAME_METRIC = {
+    "Seen": "Apps through the door",
+    "Accepted": "Accept Count",
+}
 
 
 def _normalize_kpi_feed(df: pd.DataFrame) -> pd.DataFrame:
@@ -180,69 +181,65 @@ def _normalize_kpi_feed(df: pd.DataFrame) -> pd.DataFrame:
     Normalize KPI feed coming from refresh scripts so the UI uses consistent
     executive-facing labels.
     """
-    out = df.copy()
-
-    # Normalize metric labels (primarily Sales group, based on your MVP ask).
-    rename_metric = {
-        "Seen": "Apps through the door",
-        "Accepted": "Accept Count",
-    }
-    if "Metric" in out.columns:
-        out["Metric"] = out["Metric"].replace(rename_metric)
-
-    return out
+    if "Metric" not in df.columns:
+        return df
+    # object view so a categorical Metric (Parquet feed) can take the new labels.
+    metric = df["Metric"].astype(object, copy=False)
+    # assign() returns a new frame but only allocates the replaced column.
+    return df.assign(Metric=metric.map(_RENAME_METRIC).fillna(metric))
 
 
 def _load_metrics_from_refresh_csv() -> pd.DataFrame | None:
     """
     Prefer a refreshed KPI feed if present (e.g., written by cron / refresh script).
 
-    Expected location: data/refresh/kpi_metrics.csv
+    Expected location: data/refresh/kpi_metrics.parquet (or .csv)
     Expected columns (minimum): GroupName|Group, Metric, Value, Alert, Link
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_metrics.csv"
-    if not path.exists():
+    path = latest_frame_path(KPI_METRICS_PATH)
+    if path is None:
         return None
+    return _metrics_feed_cached(str(path), path.stat().st_mtime_ns)
 
-    df = pd.read_csv(path)
+
+@st.cache_data(show_spinner=False)
+def _metrics_feed_cached(path_str: str, mtime_ns: int) -> pd.DataFrame | None:
+    """Renamed + relabelled KPI feed, rebuilt only when the feed file changes."""
+    df = _read_file_cached(path_str, mtime_ns)
 
     # Normalize naming to match the dashboard schema
     if "GroupName" in df.columns and "Group" not in df.columns:
         df = df.rename(columns={"GroupName": "Group"})
 
-    required = {"Group", "Metric", "Value", "Alert", "Link"}
-    missing = required - set(df.columns)
-    if missing:
+    if not KPI_FEED_COLS.issubset(df.columns):
         # If refresh output is incompatible, fall back to sample rather than crashing the UI.
         return None
 
-    # Ensure the dashboard's indicator column exists
-    if "Indicator" not in df.columns:
-        df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-
     return _normalize_kpi_feed(df)
 
 
 def _load_aggregated_metrics_from_refresh_csv() -> pd.Series | None:
     """
-    Load aggregated KPI metrics (single-row table) from kpi_metrics.csv.
+    Load aggregated KPI metrics (single-row table) from kpi_metrics.parquet/.csv.
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_metrics.csv"
-    if not path.exists():
-        return None
-    df = pd.read_csv(path)
-    if df.empty:
+    df = _read_kpi_metrics()
+    if df is None or df.empty:
         return None
     return df.iloc[0]
 
 
-def _load_daily_metrics_from_refresh_csv() -> pd.DataFrame | None:
-    path = BASE_DIR / "data" / "refresh" / "kpi_daily_metrics.csv"
-    if not path.exists():
+def _load_daily_metrics_from_refresh_csv(path: Path | None = None) -> pd.DataFrame | None:
+    """Daily legacy rows sorted by ActivityDate; `path` pins the file, else the newest sibling is used."""
+    if path is None:
+        path = latest_frame_path(DAILY_METRICS_PATH)
+    df = _read_file(path)
+    if df is None:
         return None
-    df = pd.read_csv(path)
     if "ActivityDate" in df.columns:
-        df["ActivityDate"] = pd.to_datetime(df["ActivityDate"], errors="coerce")
+        # Parquet can already carry datetimes; text (CSV, date objects) gets a
+        # fixed-format (ISO) parse that coerces malformed cells to NaT.
+        if not pd.api.types.is_datetime64_any_dtype(df["ActivityDate"]):
+            df["ActivityDate"] = pd.to_datetime(df["ActivityDate"], format="ISO8601", errors="coerce")
         df = df.sort_values(by="ActivityDate")
     return df
 
@@ -255,67 +252,97 @@ def _aggregate_legacy_daily_for_ui(daily_df: pd.DataFrame, exclude_sunday_for_av
     if daily_df is None or daily_df.empty:
         return None
 
-    df = daily_df.copy()
-    sums = ["Seen", "Scored", "Accepted", "Originated", "Bids", "LoansFunded"]
-    avgs = ["BidRate", "WinRate", "ScoringRate", "AcceptRate", "ConvRate", "ScoringCost", "BidCost"]
+    # Read-only from here on: filters below build new frames, so no defensive copies.
+    df = daily_df
+    sums = LEGACY_SUM_COLS
+    avgs = LEGACY_AVG_COLS
     out: dict[str, float | str | int] = {}
-    avg_df = df.copy()
+    avg_df = df
 
     if "ActivityDate" in df.columns:
-        dates = pd.to_datetime(df["ActivityDate"], errors="coerce").dropna()
+        # The loader already parses ActivityDate; only parse here if it did not.
+        activity = df["ActivityDate"]
+        if not pd.api.types.is_datetime64_any_dtype(activity):
+            activity = pd.to_datetime(activity, errors="coerce")
+        dates = activity.dropna()
         if not dates.empty:
             out["ActivityStart"] = dates.min().date().isoformat()
             out["ActivityEnd"] = dates.max().date().isoformat()
             out["Days"] = int(dates.nunique())
         if exclude_sunday_for_averages:
-            avg_df["ActivityDate"] = pd.to_datetime(avg_df["ActivityDate"], errors="coerce")
-            avg_df = avg_df[avg_df["ActivityDate"].notna()]
-            avg_df = avg_df[avg_df["ActivityDate"].dt.dayofweek != 6]
+            avg_df = df[activity.notna() & (activity.dt.dayofweek != 6)]
             if avg_df.empty:
-                avg_df = df.copy()
+                avg_df = df
 
-    for col in sums:
-        if col in df.columns:
-            out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).sum()
-    for col in avgs:
-        if col in avg_df.columns:
-            out[col] = pd.to_numeric(avg_df[col], errors="coerce").mean()
+    # One column-wise reduction per block instead of a Python loop per column.
+    sum_cols = [c for c in sums if c in df.columns]
+    if sum_cols:
+        out.update(df[sum_cols].apply(pd.to_numeric, errors="coerce").sum().to_dict())
+    avg_cols = [c for c in avgs if c in avg_df.columns]
+    if avg_cols:
+        out.update(avg_df[avg_cols].apply(pd.to_numeric, errors="coerce").mean().to_dict())
 
     if not out:
         return None
     return pd.Series(out)
 
 
+def _load_legacy_daily_aggregate(exclude_sunday_for_averages: bool = True) -> pd.Series | None:
+    """`_aggregate_legacy_daily_for_ui` over the daily refresh file, memoized per file version."""
+    path = latest_frame_path(DAILY_METRICS_PATH)
+    if path is None:
+        return None
+    return _legacy_daily_aggregate_cached(str(path), path.stat().st_mtime_ns, exclude_sunday_for_averages)
+
+
+@st.cache_data(show_spinner=False)
+def _legacy_daily_aggregate_cached(path_str: str, mtime_ns: int, exclude_sunday_for_averages: bool) -> pd.Series | None:
+    return _aggregate_legacy_daily_for_ui(
+        _load_daily_metrics_from_refresh_csv(Path(path_str)), exclude_sunday_for_averages=exclude_sunday_for_averages
+    )
+
+
+def _latest_metric_row(df: pd.DataFrame, metric_key: str, window_days: int) -> pd.Series | None:
+    """
+    Latest-dated row for one metric/window. Both predicates are applied in a
+    single mask before anything is copied, and idxmax avoids a full sort.
+    """
+    mask = df["metric_key"].astype(str).to_numpy() == str(metric_key)
+    mask &= pd.to_numeric(df["window_days"], errors="coerce").eq(window_days).to_numpy(dtype=bool, na_value=False)
+    dates = pd.to_datetime(df.loc[mask, "as_of_date"], errors="coerce").dropna()
+    if dates.empty:
+        return None
+    return df.loc[dates.idxmax()]
+
+
 def _load_metric_serving(metric_key: str, window_days: int = 7) -> dict | None:
     """
     Load one metric from windowed serving snapshot.
     Returns {"value": <float>, "status": <str>} or None.
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_serving_metrics.csv"
-    if not path.exists():
+    path = latest_frame_path(REFRESH_DIR / "kpi_serving_metrics.csv")
+    if path is None:
         return None
+    result = _load_metric_serving_cached(metric_key, int(window_days), str(path), path.stat().st_mtime_ns)
+    return dict(result) if result else None
 
-    df = pd.read_csv(path)
-    if df.empty:
+
+@lru_cache(maxsize=32)
+def _load_metric_serving_cached(metric_key: str, window_days: int, path_str: str, mtime_ns: int) -> dict | None:
+    """
+    Serving lookup memoized per file version: one render asks for the same
+    metric/window from several places (override, history status, hybrid mode).
+    """
+    df = _read_file(Path(path_str), METRIC_LOADER_COLS)
+    if df is None or df.empty:
         return None
     required = {"metric_key", "window_days", "as_of_date", "value", "status"}
     if not required.issubset(df.columns):
         return None
 
-    out = df.loc[df["metric_key"].astype(str) == str(metric_key)].copy()
-    if out.empty:
-        return None
-    out["window_days"] = pd.to_numeric(out["window_days"], errors="coerce")
-    out = out.loc[out["window_days"] == window_days]
-    if out.empty:
-        return None
-
-    out["as_of_date_dt"] = pd.to_datetime(out["as_of_date"], errors="coerce")
-    out = out.loc[out["as_of_date_dt"].notna()].sort_values("as_of_date_dt")
-    if out.empty:
+    row = _latest_metric_row(df, metric_key, window_days)
+    if row is None:
         return None
-
-    row = out.iloc[-1]
     value = _parse_numeric(row.get("value"))
     status = str(row.get("status") or "").strip().title()
     if value is None or status not in {"Red", "Yellow", "Green"}:
@@ -337,29 +364,16 @@ def _load_accept_count_history() -> dict | None:
     Returns {"value": <float>, "status": <str>} or None.
     Status is inferred from serving status when available; fallback Yellow.
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_history.csv"
-    if not path.exists():
-        return None
-    df = pd.read_csv(path)
-    if df.empty:
+    df = _read_refresh_frame("kpi_history.csv", METRIC_LOADER_COLS)
+    if df is None or df.empty:
         return None
     required = {"metric_key", "window_days", "as_of_date", "value"}
     if not required.issubset(df.columns):
         return None
 
-    out = df.loc[df["metric_key"].astype(str) == "AcceptCount"].copy()
-    if out.empty:
-        return None
-    out["window_days"] = pd.to_numeric(out["window_days"], errors="coerce")
-    out = out.loc[out["window_days"] == 1]
-    if out.empty:
-        return None
-    out["as_of_date_dt"] = pd.to_datetime(out["as_of_date"], errors="coerce")
-    out = out.loc[out["as_of_date_dt"].notna()].sort_values("as_of_date_dt")
-    if out.empty:
+    row = _latest_metric_row(df, "AcceptCount", 1)
+    if row is None:
         return None
-
-    row = out.iloc[-1]
     value = _parse_numeric(row.get("value"))
     if value is None:
         return None
@@ -376,29 +390,16 @@ def _load_originated_count_history() -> dict | None:
     Returns {"value": <float>, "status": <str>} or None.
     Status is inferred from serving status when available; fallback Yellow.
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_history.csv"
-    if not path.exists():
-        return None
-    df = pd.read_csv(path)
-    if df.empty:
+    df = _read_refresh_frame("kpi_history.csv", METRIC_LOADER_COLS)
+    if df is None or df.empty:
         return None
     required = {"metric_key", "window_days", "as_of_date", "value"}
     if not required.issubset(df.columns):
         return None
 
-    out = df.loc[df["metric_key"].astype(str) == "OriginatedCount"].copy()
-    if out.empty:
+    row = _latest_metric_row(df, "OriginatedCount", 1)
+    if row is None:
         return None
-    out["window_days"] = pd.to_numeric(out["window_days"], errors="coerce")
-    out = out.loc[out["window_days"] == 1]
-    if out.empty:
-        return None
-    out["as_of_date_dt"] = pd.to_datetime(out["as_of_date"], errors="coerce")
-    out = out.loc[out["as_of_date_dt"].notna()].sort_values("as_of_date_dt")
-    if out.empty:
-        return None
-
-    row = out.iloc[-1]
     value = _parse_numeric(row.get("value"))
     if value is None:
         return None
@@ -461,9 +462,7 @@ def _build_sales_window_placeholder(window_days: int) -> pd.DataFrame:
         {"Group": "Sales", "Metric": "Loans Funded", "Value": "—", "Alert": None, "Link": None, "Indent": 0, "IsHeadline": True},
     ]
 
-    df = pd.DataFrame(rows)
-    df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-    return df
+    return pd.DataFrame(rows)
 
 
 def _build_sales_with_window_overrides(base_sales_df: pd.DataFrame, window_days: int) -> pd.DataFrame:
@@ -482,8 +481,6 @@ def _build_sales_with_window_overrides(base_sales_df: pd.DataFrame, window_days:
         if mask.any():
             df.loc[mask, "Value"] = _format_count(payload.get("value"))
             df.loc[mask, "Alert"] = str(payload.get("status") or "Yellow")
-            if "Indicator" in df.columns:
-                df.loc[mask, "Indicator"] = df.loc[mask, "Alert"].map(_alert_icon)
 
     _apply("Accept Count", accept)
     _apply("Originated Count", originated)
@@ -495,20 +492,20 @@ def _load_compare_totals() -> dict[str, float]:
     Load benchmark totals from kpi_compare.xlsx. Returns {metric_name: total_value}.
     Expects a first column of metric names and a column named 'Totals'.
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_compare.xlsx"
-    if not path.exists():
+    if not COMPARE_XLSX.exists():
         return {}
-    df = pd.read_excel(path)
+    return _compare_totals_cached(str(COMPARE_XLSX), COMPARE_XLSX.stat().st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False)
+def _compare_totals_cached(path_str: str, mtime_ns: int) -> dict[str, float]:
+    df = _read_file_cached(path_str, mtime_ns)
     if df.empty:
         return {}
-    metric_col = df.columns[0]
     if "Totals" not in df.columns:
         return {}
-    totals = {}
-    for _, row in df.iterrows():
-        name = str(row.get(metric_col, "")).strip()
-        totals[name] = _parse_numeric(row.get("Totals"))
-    return totals
+    names = df.iloc[:, 0].astype(str).str.strip()
+    return _to_optional_dict(names, _parse_numeric_series(df["Totals"]))
 
 
 def _load_compare_averages() -> dict[str, float]:
@@ -516,53 +513,73 @@ def _load_compare_averages() -> dict[str, float]:
     Compute benchmark averages from kpi_compare.xlsx.
     Returns {metric_name: avg_value} across week columns (excludes 'Totals').
     """
-    path = BASE_DIR / "data" / "refresh" / "kpi_compare.xlsx"
-    if not path.exists():
+    if not COMPARE_XLSX.exists():
         return {}
-    df = pd.read_excel(path)
+    return _compare_averages_cached(str(COMPARE_XLSX), COMPARE_XLSX.stat().st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False)
+def _compare_averages_cached(path_str: str, mtime_ns: int) -> dict[str, float]:
+    # Keyed on the workbook version, so the parse, the reduction and the export
+    # below run once per workbook change rather than on every rerun.
+    df = _read_file_cached(path_str, mtime_ns)
     if df.empty:
         return {}
     metric_col = df.columns[0]
     value_cols = [c for c in df.columns if c not in {metric_col, "Totals"}]
-    averages = {}
-    for _, row in df.iterrows():
-        name = str(row.get(metric_col, "")).strip()
-        values = []
-        for col in value_cols:
-            val = _parse_numeric(row.get(col))
-            if val is not None:
-                values.append(val)
-        averages[name] = sum(values) / len(values) if values else None
-
-    # Persist for inspection
-    out_df = pd.DataFrame(
-        [
-            {"Metric": k, "Average": v}
-            for k, v in averages.items()
-        ]
-    )
-    out_path = BASE_DIR / "data" / "refresh" / "kpi_compare_averages.csv"
-    out_df.to_csv(out_path, index=False)
+    names = df[metric_col].astype(str).str.strip()
+    if value_cols:
+        numeric = pd.concat([_parse_numeric_series(df[c]) for c in value_cols], axis=1)
+        mean = numeric.mean(axis=1)
+    else:
+        mean = pd.Series(float("nan"), index=df.index)
+    averages = _to_optional_dict(names, mean)
+
+    # Persist for inspection, only when the workbook is newer than the last export.
+    out_path = REFRESH_DIR / "kpi_compare_averages.csv"
+    if not out_path.exists() or out_path.stat().st_mtime_ns < mtime_ns:
+        out_df = pd.DataFrame({"Metric": list(averages.keys()), "Average": list(averages.values())})
+        out_df.to_csv(out_path, index=False)
     return averages
 
 
 def _parse_numeric(value) -> float | None:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return None
-    if isinstance(value, (int, float)):
+    # Fast paths: most values arriving from pandas are already floats.
+    if isinstance(value, float):
+        return None if value != value else float(value)
+    if isinstance(value, int):
         return float(value)
-    text = str(value).strip().replace(",", "")
+    if value is None:
+        return None
+    text = str(value).strip()
+    if "," in text:
+        text = text.replace(",", "")
     if text.endswith("%"):
         try:
             return float(text[:-1]) / 100.0
-        except Exception:
+        except ValueError:
             return None
     try:
         return float(text)
-    except Exception:
+    except ValueError:
         return None
 
 
+def _parse_numeric_series(values: pd.Series) -> pd.Series:
+    """Vectorized `_parse_numeric`: '1,234' -> 1234.0, '12%' -> 0.12, unparseable -> NaN."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    text = values.astype(str).str.strip().str.replace(",", "", regex=False)
+    is_pct = text.str.endswith("%")
+    parsed = pd.to_numeric(text.where(~is_pct, text.str[:-1]), errors="coerce")
+    return parsed.where(~is_pct, parsed / 100.0)
+
+
+def _to_optional_dict(names: pd.Series, values: pd.Series) -> dict[str, float | None]:
+    """{name: value} with NaN mapped to None (later duplicate names win)."""
+    return dict(zip(names, values.astype(object).where(values.notna(), None)))
+
+
 def _compare_alert(metric_key: str, current_value, totals: dict[str, float], averages: dict[str, float]) -> str:
     """
     Compare current value to Averages benchmark.
@@ -599,6 +616,89 @@ def _alert_for_count(value) -> str:
         return "Yellow"
 
 
+# Sales table layout: (Metric, source column, value kind, compare-sheet key, indent, flag).
+# A kind of None marks a category header row; a compare key of None pins Alert to Yellow.
+SALES_SPEC: tuple[tuple[str, str | None, str | None, str | None, int, str | None], ...] = (
+    ("Apps through the door", "Seen", "count", "Seen", 0, "IsHeadline"),
+    ("Score", None, None, None, 0, "IsCategory"),
+    ("Scoring Count", "Scored", "count", "Entered Scored", 1, None),
+    ("Scoring Rate", "ScoringRate", "rate", "ScoringRate", 1, None),
+    ("Bid", None, None, None, 0, "IsCategory"),
+    ("Bid Count", "Bids", "count", "Bids", 1, None),
+    ("Bidding Rate", "BidRate", "rate", "BidRate", 1, None),
+    ("Accept", None, None, None, 0, "IsCategory"),
+    ("Accept Count", "Accepted", "count", None, 1, None),
+    ("Accept Rate", "AcceptRate", "rate", None, 1, None),
+    ("Origination", None, None, None, 0, "IsCategory"),
+    ("Originated Count", "Originated", "count", "# Originated", 1, None),
+    ("Originated Rate (Conversion Rate)", "ConvRate", "rate", None, 1, None),
+    ("Loans Funded", "LoansFunded", "count", None, 0, "IsHeadline"),
+)
+
+
+def _sales_category_row(label: str) -> dict:
+    return {"Group": "Sales", "Metric": label, "Value": "", "Alert": None, "Link": None, "Indent": 0, "IsCategory": True}
+
+
+def _sales_rows_from_source(source: pd.Series, alert_for: Callable[[str, object], str]) -> list[dict]:
+    """Build Sales rows from one aggregated/daily row; `alert_for(compare_key, raw_value)` picks Alert."""
+    rows: list[dict] = []
+    for label, key, kind, compare_key, indent, flag in SALES_SPEC:
+        if kind is None:
+            rows.append(_sales_category_row(label))
+            continue
+        raw = source.get(key)
+        row = {
+            "Group": "Sales",
+            "Metric": label,
+            "Value": _format_count(raw) if kind == "count" else _format_rate(raw),
+            "Alert": alert_for(compare_key, raw) if compare_key else "Yellow",
+            "Link": None,
+            "Indent": indent,
+        }
+        if flag:
+            row[flag] = True
+        rows.append(row)
+    return rows
+
+
+def _sales_rows_from_feed(kpi_feed: pd.DataFrame) -> list[dict]:
+    """Build Sales rows by picking labelled rows out of a row-based KPI feed."""
+    # One pass over the feed; the first row per Metric wins, as with a .loc scan.
+    lookup: dict[str, dict] = {}
+    for record in kpi_feed.to_dict("records"):
+        lookup.setdefault(record.get("Metric"), record)
+
+    rows: list[dict] = []
+    for label, _, kind, compare_key, indent, flag in SALES_SPEC:
+        if kind is None:
+            rows.append(_sales_category_row(label))
+            continue
+        match = lookup.get(label)
+        if match is not None:
+            row = dict(match)
+            row["Group"] = "Sales"
+            row["Indent"] = indent
+            if flag == "IsHeadline":
+                row["IsHeadline"] = True
+            if compare_key is None:
+                row["Alert"] = "Yellow"
+            rows.append(row)
+        else:
+            rows.append(
+                {
+                    "Group": "Sales",
+                    "Metric": label,
+                    "Value": "—",
+                    "Alert": "Yellow",
+                    "Link": None,
+                    "Indent": indent,
+                    "IsHeadline": flag == "IsHeadline",
+                }
+            )
+    return rows
+
+
 def _build_sales_kpis(
     kpi_feed: pd.DataFrame | None,
     daily_df: pd.DataFrame | None,
@@ -607,398 +707,152 @@ def _build_sales_kpis(
     averages: dict[str, float],
     accept_serving: dict | None = None,
 ) -> pd.DataFrame:
-    # Prefer aggregated metrics (kpi_metrics.csv). Fall back to daily_df, then sample.
+    # Prefer aggregated metrics (kpi_metrics). Fall back to daily_df, then sample.
     if agg_row is not None:
-        rows = [
-            {
-                "Group": "Sales",
-                "Metric": "Apps through the door",
-                "Value": _format_count(agg_row.get("Seen")),
-                "Alert": _compare_alert("Seen", agg_row.get("Seen"), totals, averages),
-                "Link": None,
-                "Indent": 0,
-                "IsHeadline": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Score",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Scoring Count",
-                "Value": _format_count(agg_row.get("Scored")),
-                "Alert": _compare_alert("Entered Scored", agg_row.get("Scored"), totals, averages),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Scoring Rate",
-                "Value": _format_rate(agg_row.get("ScoringRate")),
-                "Alert": _compare_alert("ScoringRate", agg_row.get("ScoringRate"), totals, averages),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bid",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bid Count",
-                "Value": _format_count(agg_row.get("Bids")),
-                "Alert": _compare_alert("Bids", agg_row.get("Bids"), totals, averages),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bidding Rate",
-                "Value": _format_rate(agg_row.get("BidRate")),
-                "Alert": _compare_alert("BidRate", agg_row.get("BidRate"), totals, averages),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept Count",
-                "Value": _format_count(agg_row.get("Accepted")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept Rate",
-                "Value": _format_rate(agg_row.get("AcceptRate")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Origination",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Originated Count",
-                "Value": _format_count(agg_row.get("Originated")),
-                "Alert": _compare_alert("# Originated", agg_row.get("Originated"), totals, averages),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Originated Rate (Conversion Rate)",
-                "Value": _format_rate(agg_row.get("ConvRate")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Loans Funded",
-                "Value": _format_count(agg_row.get("LoansFunded")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 0,
-                "IsHeadline": True,
-            },
-        ]
-        rows = _apply_accept_count_override(rows, accept_serving)
-        df = pd.DataFrame(rows)
-        df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-        return df
-
-    if daily_df is not None and not daily_df.empty:
-        latest = daily_df.tail(1).iloc[0]
-        rows = [
-            {
-                "Group": "Sales",
-                "Metric": "Apps through the door",
-                "Value": _format_count(latest.get("Seen")),
-                "Alert": _alert_for_count(latest.get("Seen")),
-                "Link": None,
-                "Indent": 0,
-                "IsHeadline": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Score",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Scoring Count",
-                "Value": _format_count(latest.get("Scored")),
-                "Alert": _alert_for_count(latest.get("Scored")),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Scoring Rate",
-                "Value": _format_rate(latest.get("ScoringRate")),
-                "Alert": _alert_for_count(latest.get("ScoringRate")),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bid",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bid Count",
-                "Value": _format_count(latest.get("Bids")),
-                "Alert": _alert_for_count(latest.get("Bids")),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Bidding Rate",
-                "Value": _format_rate(latest.get("BidRate")),
-                "Alert": _alert_for_count(latest.get("BidRate")),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept Count",
-                "Value": _format_count(latest.get("Accepted")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Accept Rate",
-                "Value": _format_rate(latest.get("AcceptRate")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Origination",
-                "Value": "",
-                "Alert": None,
-                "Link": None,
-                "Indent": 0,
-                "IsCategory": True,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Originated Count",
-                "Value": _format_count(latest.get("Originated")),
-                "Alert": _alert_for_count(latest.get("Originated")),
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Originated Rate (Conversion Rate)",
-                "Value": _format_rate(latest.get("ConvRate")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 1,
-            },
-            {
-                "Group": "Sales",
-                "Metric": "Loans Funded",
-                "Value": _format_count(latest.get("LoansFunded")),
-                "Alert": "Yellow",
-                "Link": None,
-                "Indent": 0,
-                "IsHeadline": True,
-            },
-        ]
-        rows = _apply_accept_count_override(rows, accept_serving)
-        df = pd.DataFrame(rows)
-        df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-        return df
-
-    if kpi_feed is not None and not kpi_feed.empty:
-        needed = [
-            "Apps through the door",
-            "Scoring Count",
-            "Scoring Rate",
-            "Bid Count",
-            "Bidding Rate",
-            "Accept Count",
-            "Accept Rate",
-            "Originated Count",
-            "Originated Rate (Conversion Rate)",
-            "Loans Funded",
-        ]
-        rows = []
-        for metric in needed:
-            match = kpi_feed.loc[kpi_feed["Metric"] == metric]
-            if not match.empty:
-                row = match.iloc[0].to_dict()
-                row["Group"] = "Sales"
-                row["Indent"] = 1 if metric in {"Scoring Count", "Scoring Rate", "Bid Count", "Bidding Rate", "Accept Count", "Accept Rate", "Originated Count", "Originated Rate (Conversion Rate)"} else 0
-                if metric in {"Apps through the door", "Loans Funded"}:
-                    row["IsHeadline"] = True
-                if metric in {"Accept Count", "Accept Rate", "Originated Rate (Conversion Rate)", "Loans Funded"}:
-                    row["Alert"] = "Yellow"
-                rows.append(row)
-            else:
-                rows.append(
-                    {
-                        "Group": "Sales",
-                        "Metric": metric,
-                        "Value": "—",
-                        "Alert": "Yellow",
-                        "Link": None,
-                        "Indent": 1 if metric in {"Scoring Count", "Scoring Rate", "Bid Count", "Bidding Rate", "Accept Count", "Accept Rate", "Originated Count", "Originated Rate (Conversion Rate)"} else 0,
-                        "IsHeadline": True if metric in {"Apps through the door", "Loans Funded"} else False,
-                    }
-                )
-        # Insert category rows for visual grouping.
-        rows.insert(1, {"Group": "Sales", "Metric": "Score", "Value": "", "Alert": None, "Link": None, "Indent": 0, "IsCategory": True})
-        rows.insert(4, {"Group": "Sales", "Metric": "Bid", "Value": "", "Alert": None, "Link": None, "Indent": 0, "IsCategory": True})
-        rows.insert(7, {"Group": "Sales", "Metric": "Accept", "Value": "", "Alert": None, "Link": None, "Indent": 0, "IsCategory": True})
-        rows.insert(10, {"Group": "Sales", "Metric": "Origination", "Value": "", "Alert": None, "Link": None, "Indent": 0, "IsCategory": True})
-        rows = _apply_accept_count_override(rows, accept_serving)
-        df = pd.DataFrame(rows)
-        if "Indicator" not in df.columns:
-            df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-        return df
-
-    return _sample_metrics().loc[lambda d: d["Group"] == "Sales"].copy()
+        rows = _sales_rows_from_source(agg_row, lambda key, raw: _compare_alert(key, raw, totals, averages))
+    elif daily_df is not None and not daily_df.empty:
+        rows = _sales_rows_from_source(daily_df.tail(1).iloc[0], lambda _key, raw: _alert_for_count(raw))
+    elif kpi_feed is not None and not kpi_feed.empty:
+        rows = _sales_rows_from_feed(kpi_feed)
+    else:
+        return _sample_metrics().loc[lambda d: d["Group"] == "Sales"].copy()
+
+    rows = _apply_accept_count_override(rows, accept_serving)
+    return pd.DataFrame(rows)
+
+
+# Skeleton structure (placeholders only)
+_PERFORMANCE_METRICS = (
+    "Defaults Rate %",
+    "Returns vs Historical Avg",
+    "Payin Ratio (NEW / RETURN)",
+    "Collections / Resets Ratio",
+)
+_CALL_CENTER_METRICS = (
+    "# Trained Agents",
+    "# Total Agents",
+    "Capacity (Accepted / Trained)",
+    "Agent Collection Ratio",
+    "Cost per Agent",
+)
+
+
+def _placeholder_group(group: str, metrics: tuple[str, ...]) -> pd.DataFrame:
+    n = len(metrics)
+    return pd.DataFrame(
+        {
+            "Group": [group] * n,
+            "Metric": list(metrics),
+            "Value": ["—"] * n,
+            "Alert": [None] * n,
+            "Link": [None] * n,
+        }
+    )
 
 
+# Streamlit re-executes this script on every rerun, so a module-level lru_cache
+# starts empty each time; st.cache_data persists across reruns and sessions.
+@st.cache_data(show_spinner=False)
 def _build_performance_kpis() -> pd.DataFrame:
-    # Skeleton structure (placeholders only)
-    rows = [
-        {"Group": "Performance", "Metric": "Defaults Rate %", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "Performance", "Metric": "Returns vs Historical Avg", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "Performance", "Metric": "Payin Ratio (NEW / RETURN)", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "Performance", "Metric": "Collections / Resets Ratio", "Value": "—", "Alert": None, "Link": None},
-    ]
-    df = pd.DataFrame(rows)
-    df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-    return df
+    return _placeholder_group("Performance", _PERFORMANCE_METRICS)
 
 
+@st.cache_data(show_spinner=False)
 def _build_call_center_kpis() -> pd.DataFrame:
-    rows = [
-        {"Group": "CallCenter", "Metric": "# Trained Agents", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "CallCenter", "Metric": "# Total Agents", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "CallCenter", "Metric": "Capacity (Accepted / Trained)", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "CallCenter", "Metric": "Agent Collection Ratio", "Value": "—", "Alert": None, "Link": None},
-        {"Group": "CallCenter", "Metric": "Cost per Agent", "Value": "—", "Alert": None, "Link": None},
-    ]
-    df = pd.DataFrame(rows)
-    df.insert(3, "Indicator", df["Alert"].map(_alert_icon))
-    return df
+    return _placeholder_group("CallCenter", _CALL_CENTER_METRICS)
+
+
+# Relative widths of the Metric / Value / Status / Link columns.
+_KPI_TABLE_WIDTHS = (3.2, 1.1, 1.2, 1.6)
+_KPI_TABLE_HEAD = (
+    '<table class="kpi-table"><colgroup>'
+    + "".join(f'<col style="width:{100.0 * w / sum(_KPI_TABLE_WIDTHS):.1f}%">' for w in _KPI_TABLE_WIDTHS)
+    + "</colgroup><thead><tr>"
+    + "".join(f'<th class="kpi-header">{h}</th>' for h in ("Metric", "Value", "Status", "Link"))
+    + "</tr></thead><tbody>"
+)
+
+
+def _kpi_table_html(title: str, df: pd.DataFrame) -> str:
+    """HTML for one KPI group: title, divider and a single table."""
+    n = len(df)
+
+    def _col(name: str, default=None) -> list:
+        return df[name].tolist() if name in df.columns else [default] * n
+
+    body: list[str] = []
+    for metric, value, alert, link, indent, is_category, is_headline in zip(
+        _col("Metric", ""),
+        _col("Value", ""),
+        _col("Alert"),
+        _col("Link"),
+        _col("Indent", 0),
+        _col("IsCategory"),
+        _col("IsHeadline"),
+    ):
+        indent_level = int(indent) if isinstance(indent, (int, float)) and not pd.isna(indent) else 0
+        # `is True` avoids treating NaN as truthy
+        body.append(
+            '<tr class="kpi-row">'
+            f"<td>{_metric_html(metric, indent_level, is_category is True, is_headline is True)}</td>"
+            f"<td>{_escape_html(value)}</td>"
+            f"<td>{_status_html(alert)}</td>"
+            f'<td>{_link_html(str(link or ""))}</td>'
+            "</tr>"
+        )
+
+    return (
+        f'<div class="kpi-group">{_escape_html(title)}</div>'
+        '<div class="kpi-divider"></div>'
+        f'{_KPI_TABLE_HEAD}{"".join(body)}</tbody></table>'
+    )
 
 
 def _render_kpi_table(title: str, df: pd.DataFrame) -> None:
-    st.markdown(f'<div class="kpi-group">{_escape_html(title)}</div>', unsafe_allow_html=True)
-    st.markdown('<div class="kpi-divider"></div>', unsafe_allow_html=True)
-
-    h1, h2, h3, h4 = st.columns([3.2, 1.1, 1.2, 1.6])
-    h1.markdown('<div class="kpi-header">Metric</div>', unsafe_allow_html=True)
-    h2.markdown('<div class="kpi-header">Value</div>', unsafe_allow_html=True)
-    h3.markdown('<div class="kpi-header">Status</div>', unsafe_allow_html=True)
-    h4.markdown('<div class="kpi-header">Link</div>', unsafe_allow_html=True)
-
-    for _, row in df.iterrows():
-        col1, col2, col3, col4 = st.columns([3.2, 1.1, 1.2, 1.6])
-        indent_level = int(row.get("Indent", 0)) if isinstance(row.get("Indent", 0), (int, float)) else 0
-        # Avoid treating NaN as truthy
-        is_category = True if row.get("IsCategory") is True else False
-        is_headline = True if row.get("IsHeadline") is True else False
-        col1.markdown(
-            f'<div class="kpi-row">{_metric_html(row["Metric"], indent_level, is_category, is_headline)}</div>',
-            unsafe_allow_html=True,
-        )
-        col2.markdown(f'<div class="kpi-row">{_escape_html(row["Value"])}</div>', unsafe_allow_html=True)
-        col3.markdown(f'<div class="kpi-row">{_status_html(row.get("Alert"))}</div>', unsafe_allow_html=True)
-        col4.markdown(f'<div class="kpi-row">{_link_html(str(row.get("Link") or ""))}</div>', unsafe_allow_html=True)
+    """Render a KPI group as one HTML table (a single Streamlit element)."""
+    st.markdown(_kpi_table_html(title, df), unsafe_allow_html=True)
+
+
+_STATIC_GROUP_BUILDERS: dict[str, Callable[[], pd.DataFrame]] = {
+    "Performance": _build_performance_kpis,
+    "CallCenter": _build_call_center_kpis,
+}
+
+
+@st.cache_data(show_spinner=False)
+def _static_kpi_table_html(title: str, group: str) -> str:
+    """Markup for a placeholder group; its rows never change, so it is cached across reruns."""
+    return _kpi_table_html(title, _STATIC_GROUP_BUILDERS[group]())
+
+
+# Minified: the block is re-sent on every rerun.
+_DEV_VIEW_CSS = (
+    "<style>"
+    ".block-container{padding-top:2.0rem;padding-bottom:2.0rem;}"
+    ".badge{display:inline-flex;align-items:center;gap:0.25rem;padding:0.18rem 0.55rem;"
+    "border-radius:999px;border:1px solid rgba(255,255,255,0.12);font-size:0.85rem;font-weight:600;"
+    "white-space:nowrap;}"
+    ".badge-red{background:rgba(255,77,79,0.18);border-color:rgba(255,77,79,0.35);}"
+    ".badge-yellow{background:rgba(250,173,20,0.18);border-color:rgba(250,173,20,0.35);}"
+    ".badge-green{background:rgba(82,196,26,0.18);border-color:rgba(82,196,26,0.35);}"
+    ".badge-grey{background:rgba(140,140,140,0.22);border-color:rgba(200,200,200,0.32);}"
+    ".kpi-table{width:100%;border-collapse:collapse;table-layout:fixed;}"
+    ".kpi-table th,.kpi-table td{border:none;text-align:left;vertical-align:middle;"
+    "padding:0.15rem 0.5rem 0.15rem 0;}"
+    ".kpi-header{font-size:0.85rem;font-weight:700;opacity:0.85;padding:0.25rem 0;}"
+    ".kpi-row{padding:0.15rem 0;}"
+    ".kpi-headline{font-weight:700;font-size:1.0rem;}"
+    ".kpi-submetric{font-weight:400;}"
+    ".kpi-muted{opacity:0.8;}"
+    ".kpi-group{font-size:0.95rem;font-weight:750;margin-top:0.75rem;}"
+    ".kpi-divider{height:1px;background:rgba(255,255,255,0.10);margin:0.35rem 0 0.55rem 0;}"
+    "</style>"
+)
 
 
 def render_dev_view(source_profile: str | None = None) -> None:
-    st.markdown(
-        """
-<style>
-  /* tighten overall layout a bit */
-  .block-container { padding-top: 2.0rem; padding-bottom: 2.0rem; }
-
-  /* simple status badges */
-  .badge {
-    display: inline-flex;
-    align-items: center;
-    gap: 0.25rem;
-    padding: 0.18rem 0.55rem;
-    border-radius: 999px;
-    border: 1px solid rgba(255,255,255,0.12);
-    font-size: 0.85rem;
-    font-weight: 600;
-    white-space: nowrap;
-  }
-  .badge-red { background: rgba(255, 77, 79, 0.18); border-color: rgba(255, 77, 79, 0.35); }
-  .badge-yellow { background: rgba(250, 173, 20, 0.18); border-color: rgba(250, 173, 20, 0.35); }
-  .badge-green { background: rgba(82, 196, 26, 0.18); border-color: rgba(82, 196, 26, 0.35); }
-  .badge-grey { background: rgba(140, 140, 140, 0.22); border-color: rgba(200, 200, 200, 0.32); }
-
-  /* table header row */
-  .kpi-header { font-size: 0.85rem; font-weight: 700; opacity: 0.85; padding: 0.25rem 0; }
-  .kpi-row { padding: 0.15rem 0; }
-  .kpi-headline { font-weight: 700; font-size: 1.0rem; }
-  .kpi-submetric { font-weight: 400; }
-  .kpi-muted { opacity: 0.8; }
-  .kpi-group { font-size: 0.95rem; font-weight: 750; margin-top: 0.75rem; }
-  .kpi-divider { height: 1px; background: rgba(255,255,255,0.10); margin: 0.35rem 0 0.55rem 0; }
-</style>
-""",
-        unsafe_allow_html=True,
-    )
+    # Re-emitted every rerun: Streamlit drops elements a rerun does not produce.
+    st.markdown(_DEV_VIEW_CSS, unsafe_allow_html=True)
 
     st.markdown("## Development (Current UI)")
     st.caption("MVP showcase: traffic-light alerts + deep links (links may be null).")
@@ -1044,14 +898,14 @@ def render_dev_view(source_profile: str | None = None) -> None:
                 help="Affects average-type legacy KPIs only. Count totals remain unchanged.",
             )
         if legacy_exclude_sunday:
-            ui_agg = _aggregate_legacy_daily_for_ui(daily_df, exclude_sunday_for_averages=True)
+            ui_agg = _load_legacy_daily_aggregate(exclude_sunday_for_averages=True)
             if ui_agg is not None:
                 agg_row = ui_agg
                 source_note = "Source: Legacy mode active. Sundays excluded from averages (Advanced override)."
             else:
-                source_note = "Source: Legacy mode active. Sunday-exclusion override unavailable; using kpi_metrics.csv."
+                source_note = "Source: Legacy mode active. Sunday-exclusion override unavailable; using kpi_metrics."
         else:
-            source_note = "Source: Legacy mode active. Values from kpi_metrics.csv."
+            source_note = "Source: Legacy mode active. Values from kpi_metrics."
     elif source_profile == "Sample demo (no CSV required)":
         kpi_feed = None
         daily_df = None
@@ -1073,36 +927,32 @@ def render_dev_view(source_profile: str | None = None) -> None:
         hybrid_green_mask = sales_7d_df["Metric"].astype(str).str.strip().isin(hybrid_green_metrics)
         if hybrid_green_mask.any():
             sales_7d_df.loc[hybrid_green_mask, "Alert"] = "Green"
-            if "Indicator" in sales_7d_df.columns:
-                sales_7d_df.loc[hybrid_green_mask, "Indicator"] = sales_7d_df.loc[
-                    hybrid_green_mask, "Alert"
-                ].map(_alert_icon)
     else:
-        sales_7d_df = base_sales_df.copy()
+        # base_sales_df is built fresh per rerun and not touched again, so no copy.
+        sales_7d_df = base_sales_df
     # 1D/30D/60D tabs: placeholder model for non-AcceptCount KPIs.
     sales_1d_df = _build_sales_window_placeholder(1)
     sales_30d_df = _build_sales_window_placeholder(30)
     sales_60d_df = _build_sales_window_placeholder(60)
-    sales_df = sales_7d_df.copy()
+    # Only the Alert column feeds the summary tiles, so that is all we override
+    # (the rendered 7D table keeps its own alerts).
+    sales_alerts = sales_7d_df["Alert"]
     if source_profile == "Legacy only (all KPIs from old pipeline)":
         # Legacy demo preference: Accept Rate shown as Green.
-        legacy_accept_rate_mask = sales_df["Metric"].astype(str).str.strip() == "Accept Rate"
+        legacy_accept_rate_mask = sales_7d_df["Metric"].astype(str).str.strip() == "Accept Rate"
         if legacy_accept_rate_mask.any():
-            sales_df.loc[legacy_accept_rate_mask, "Alert"] = "Green"
-            if "Indicator" in sales_df.columns:
-                sales_df.loc[legacy_accept_rate_mask, "Indicator"] = sales_df.loc[
-                    legacy_accept_rate_mask, "Alert"
-                ].map(_alert_icon)
+            sales_alerts = sales_alerts.mask(legacy_accept_rate_mask, "Green")
     performance_df = _build_performance_kpis()
     call_center_df = _build_call_center_kpis()
 
-    df = pd.concat([sales_df, performance_df, call_center_df], ignore_index=True)
+    alerts = pd.concat([sales_alerts, performance_df["Alert"], call_center_df["Alert"]], ignore_index=True)
 
-    red_count = int((df["Alert"].str.lower() == "red").sum())
-    yellow_count = int((df["Alert"].str.lower() == "yellow").sum())
-    green_count = int((df["Alert"].str.lower() == "green").sum())
+    alert_counts = alerts.str.lower().value_counts()
+    red_count = int(alert_counts.get("red", 0))
+    yellow_count = int(alert_counts.get("yellow", 0))
+    green_count = int(alert_counts.get("green", 0))
     # Temporary legacy pin for demo parity; other modes remain dynamic.
-    metrics_tracked = 10 if source_profile == "Legacy only (all KPIs from old pipeline)" else len(df)
+    metrics_tracked = 10 if source_profile == "Legacy only (all KPIs from old pipeline)" else len(alerts)
 
     c1, c2, c3, c4 = st.columns([1.2, 1, 1, 1.4])
     c1.metric("Metrics tracked", metrics_tracked)
@@ -1110,15 +960,15 @@ def render_dev_view(source_profile: str | None = None) -> None:
     c3.metric("🟡 Yellow", yellow_count)
     c4.metric("🟢 Green", green_count)
 
-    level = st.selectbox(
+    # The selection is not applied to the group tables yet (they render unfiltered),
+    # so no filtered copy is built here.
+    st.selectbox(
         "Filter",
         options=["All", "Red", "Yellow", "Green"],
         index=0,
         label_visibility="collapsed",
         key="alert_filter",
     )
-    if level != "All":
-        df = df.loc[df["Alert"].str.lower() == level.lower()].copy()
 
     st.divider()
 
@@ -1132,18 +982,19 @@ def render_dev_view(source_profile: str | None = None) -> None:
     with sales_tabs[3]:
         _render_kpi_table("Sales KPIs", sales_60d_df)
     st.divider()
-    _render_kpi_table("SERVICING / PERFORMANCE KPIs", performance_df)
-    st.divider()
-    _render_kpi_table("CALL CENTER PERFORMANCE KPIs", call_center_df)
+    # Both placeholder groups go out as one element; <hr> stands in for st.divider().
+    st.markdown(
+        _static_kpi_table_html("SERVICING / PERFORMANCE KPIs", "Performance")
+        + "<hr>"
+        + _static_kpi_table_html("CALL CENTER PERFORMANCE KPIs", "CallCenter"),
+        unsafe_allow_html=True,
+    )
 
 
 def _load_history_df() -> pd.DataFrame:
-    path = BASE_DIR / "data" / "refresh" / "kpi_history.csv"
-    if not path.exists():
+    df = _read_refresh_frame("kpi_history.csv")
+    if df is None or df.empty:
         return pd.DataFrame()
-    df = pd.read_csv(path)
-    if df.empty:
-        return df
     if "as_of_date" in df.columns:
         df["as_of_date_dt"] = pd.to_datetime(df["as_of_date"], errors="coerce")
         df = df[df["as_of_date_dt"].notna()].sort_values("as_of_date_dt")
@@ -1151,12 +1002,9 @@ def _load_history_df() -> pd.DataFrame:
 
 
 def _load_serving_df() -> pd.DataFrame:
-    path = BASE_DIR / "data" / "refresh" / "kpi_serving_metrics.csv"
-    if not path.exists():
+    df = _read_refresh_frame("kpi_serving_metrics.csv")
+    if df is None or df.empty:
         return pd.DataFrame()
-    df = pd.read_csv(path)
-    if df.empty:
-        return df
     if "as_of_date" in df.columns:
         df["as_of_date_dt"] = pd.to_datetime(df["as_of_date"], errors="coerce")
     if "window_days" in df.columns:
@@ -1186,11 +1034,10 @@ def _compute_delta_vs_7d(metric_key: str, value_type: str, history_df: pd.DataFr
     required = {"metric_key", "window_days", "value", "as_of_date_dt"}
     if not required.issubset(history_df.columns):
         return "vs 7D: n/a"
-    m = history_df[history_df["metric_key"].astype(str) == str(metric_key)].copy()
-    if m.empty:
-        return "vs 7D: n/a"
-    m["window_days"] = pd.to_numeric(m["window_days"], errors="coerce")
-    m = m[m["window_days"] == 1].sort_values("as_of_date_dt")
+    # _load_history_df already returns rows in date order, so filtering keeps it.
+    mask = history_df["metric_key"].astype(str).to_numpy() == str(metric_key)
+    mask &= pd.to_numeric(history_df["window_days"], errors="coerce").eq(1).to_numpy(dtype=bool, na_value=False)
+    m = history_df[mask]
     if len(m) < 14:
         return "vs 7D: n/a"
     values = pd.to_numeric(m["value"], errors="coerce").dropna()
@@ -1211,16 +1058,16 @@ def _latest_serving_row(serving_df: pd.DataFrame, metric_key: str, window_days:
     required = {"metric_key", "window_days"}
     if not required.issubset(serving_df.columns):
         return None
-    m = serving_df[serving_df["metric_key"].astype(str) == str(metric_key)].copy()
-    if m.empty:
-        return None
-    m["window_days"] = pd.to_numeric(m["window_days"], errors="coerce")
-    m = m[m["window_days"] == int(window_days)]
+    mask = serving_df["metric_key"].astype(str).to_numpy() == str(metric_key)
+    mask &= pd.to_numeric(serving_df["window_days"], errors="coerce").eq(int(window_days)).to_numpy(dtype=bool, na_value=False)
+    m = serving_df[mask]
     if m.empty:
         return None
-    if "as_of_date_dt" in m.columns:
-        m = m[m["as_of_date_dt"].notna()].sort_values("as_of_date_dt")
-    return m.iloc[-1] if not m.empty else None
+    if "as_of_date_dt" not in m.columns:
+        return m.iloc[-1]
+    dates = m["as_of_date_dt"].dropna()
+    # Linear scan for the latest date; no sort of the filtered frame.
+    return m.loc[dates.idxmax()] if not dates.empty else None
 
 
 def _build_wallboard_kpi_rows(source_mode: str) -> list[dict]:
@@ -1271,28 +1118,26 @@ def _build_wallboard_kpi_rows(source_mode: str) -> list[dict]:
     return rows
 
 
+_WALLBOARD_CSS = (
+    "<style>"
+    ".block-container{padding-top:1.1rem;padding-bottom:1.1rem;}"
+    ".wb-summary-label{font-size:0.82rem;opacity:0.82;}"
+    ".wb-section-title{font-size:1.02rem;font-weight:700;margin:0.1rem 0 0.35rem 0;}"
+    ".wb-card{border:1px solid rgba(255,255,255,0.10);border-radius:10px;"
+    "padding:0.7rem 0.8rem 0.65rem 0.8rem;background:rgba(255,255,255,0.015);min-height:165px;}"
+    ".wb-card-label{font-size:0.82rem;opacity:0.88;}"
+    ".wb-card-value{font-size:2.05rem;font-weight:720;line-height:1.04;margin-top:0.25rem;}"
+    ".wb-card-delta{font-size:0.84rem;opacity:0.85;margin-top:0.35rem;}"
+    ".wb-card-meta{font-size:0.76rem;opacity:0.78;margin-top:0.32rem;}"
+    ".kpi-table{width:100%;border-collapse:collapse;table-layout:fixed;}"
+    ".kpi-table th,.kpi-table td{border:none;text-align:left;vertical-align:middle;"
+    "padding:0.15rem 0.5rem 0.15rem 0;}"
+    "</style>"
+)
+
+
 def _render_wallboard_styles() -> None:
-    st.markdown(
-        """
-<style>
-  .block-container { padding-top: 1.1rem; padding-bottom: 1.1rem; }
-  .wb-summary-label { font-size: 0.82rem; opacity: 0.82; }
-  .wb-section-title { font-size: 1.02rem; font-weight: 700; margin: 0.1rem 0 0.35rem 0; }
-  .wb-card {
-    border: 1px solid rgba(255,255,255,0.10);
-    border-radius: 10px;
-    padding: 0.7rem 0.8rem 0.65rem 0.8rem;
-    background: rgba(255,255,255,0.015);
-    min-height: 165px;
-  }
-  .wb-card-label { font-size: 0.82rem; opacity: 0.88; }
-  .wb-card-value { font-size: 2.05rem; font-weight: 720; line-height: 1.04; margin-top: 0.25rem; }
-  .wb-card-delta { font-size: 0.84rem; opacity: 0.85; margin-top: 0.35rem; }
-  .wb-card-meta { font-size: 0.76rem; opacity: 0.78; margin-top: 0.32rem; }
-</style>
-""",
-        unsafe_allow_html=True,
-    )
+    st.markdown(_WALLBOARD_CSS, unsafe_allow_html=True)
 
 
 def _wallboard_summary_counts(rows: list[dict]) -> tuple[int, int, int, int]:
@@ -1340,7 +1185,6 @@ def _render_layer_b(rows: list[dict]) -> None:
         table_df = pd.DataFrame(
             [{"Metric": r["metric_label"], "Value": r["value_text"], "Alert": r["status"], "Link": r.get("drilldown_url")} for r in domain_rows[:6]]
         )
-        table_df.insert(2, "Indicator", table_df["Alert"].map(_alert_icon))
         _render_kpi_table(f"{domain} KPIs", table_df)
 
 
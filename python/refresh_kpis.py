@@ -1,116 +1,131 @@
 from __future__ import annotations
 
 import argparse
-import os
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pandas as pd
-from dotenv import load_dotenv
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from scripts.frame_io import FORMATS, write_frame
 from scripts.logging_utils import setup_logger
 
 LOGGER = setup_logger(__name__, "refresh_kpis")
 SQL_FILE = REPO_ROOT / "sql" / "kpi_metrics.sql"
 OUTPUT_DIR = REPO_ROOT / "data" / "refresh"
-OUTPUT_CSV = OUTPUT_DIR / "kpi_metrics.csv"
-RAW_OUTPUT_CSV = OUTPUT_DIR / "kpi_daily_metrics.csv"
-
-def _configure_odbc_ini_for_homebrew_macos() -> None:
-    """
-    If Homebrew unixODBC is installed on macOS, ensure Driver Manager env vars
-    point at its config so pyodbc can discover registered drivers.
-    """
-    if os.name != "posix":
-        return
-    try:
-        if os.uname().sysname.lower() != "darwin":
-            return
-    except Exception:
-        return
-
-    hb_etc = Path("/opt/homebrew/etc")
-    alt_etc = Path("/usr/local/etc")
-    etc_dir = hb_etc if hb_etc.exists() else alt_etc
-    odbcinst = etc_dir / "odbcinst.ini"
-    if not odbcinst.exists():
-        return
-
-    # unixODBC + iODBC typically honor these.
-    os.environ.setdefault("ODBCSYSINI", str(etc_dir))
-    os.environ.setdefault("ODBCINSTINI", "odbcinst.ini")
-
-    # Some stacks also rely on ODBCINI for data sources; harmless to set if missing.
-    os.environ.setdefault("ODBCINI", str(etc_dir / "odbc.ini"))
-
-
-# Configure early so environments (conda/pyenv) can locate driver registry.
-_configure_odbc_ini_for_homebrew_macos()
+OUTPUT_PARQUET = OUTPUT_DIR / "kpi_metrics.parquet"
+RAW_OUTPUT_PARQUET = OUTPUT_DIR / "kpi_daily_metrics.parquet"
+# Rows per fetchmany() block; also used as the ODBC cursor arraysize hint.
+FETCH_CHUNK_ROWS = 10_000
+# Low-cardinality KPI feed columns the dashboard groups/filters on. Alert stays
+# plain text: the dashboard lower-cases it and assigns override values.
+KPI_CATEGORY_COLS = ("GroupName", "Metric")
+# Daily cost columns reported as a plain mean over the (weekday-filtered) days.
+COST_COLS = ("ScoringCost", "BidCost")
 
 
-import pyodbc  # noqa: E402
+if TYPE_CHECKING:
+    import pyodbc
 
 try:
     # Optional: if config exists, use it for alert thresholds.
-    from scripts.controller import get_threshold_value, get_thresholds  # type: ignore
+    from scripts.controller import get_thresholds  # type: ignore
 except Exception:  # pragma: no cover
-    get_threshold_value = None  # type: ignore
     get_thresholds = None  # type: ignore
 
 
-def _yield_result_sets(cursor: pyodbc.Cursor):
-    """Iterate over result sets produced by a multi-statement script."""
+def _yield_result_sets(cursor: pyodbc.Cursor, chunksize: int = FETCH_CHUNK_ROWS):
+    """
+    Iterate over result sets produced by a multi-statement script.
+    Rows are pulled in `chunksize` blocks and transposed into per-column lists
+    as they arrive, so no block of row tuples outlives its fetch and the frame
+    is built once, column-wise.
+    """
     while True:
         if cursor.description:
             columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            yield pd.DataFrame.from_records(rows, columns=columns)
+            values: list[list] = [[] for _ in columns]
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                for acc, col_values in zip(values, zip(*rows)):
+                    acc.extend(col_values)
+            # Positional keys keep duplicate column names from the SQL intact.
+            df = pd.DataFrame(dict(enumerate(values)))
+            df.columns = columns
+            yield df
         if not cursor.nextset():
             break
 
 
-def get_db_connection(database: str) -> pyodbc.Connection:
-    load_dotenv()
-    _configure_odbc_ini_for_homebrew_macos()
-    server = os.getenv("DB_SERVER", "")
-    # Support both naming conventions:
-    # - CloneLending_guide uses DB_USERNAME
-    # - Your current .env uses DB_USER
-    username = os.getenv("DB_USERNAME", "") or os.getenv("DB_USER", "")
-    password = os.getenv("DB_PASSWORD", "")
-    driver = os.getenv("ODBC_DRIVER_VERSION", "ODBC Driver 18 for SQL Server")
-
-    if not server or not username or not password:
-        raise ValueError(
-            "Database credentials are not configured. Set DB_SERVER, DB_USERNAME (or DB_USER), and DB_PASSWORD in your environment or .env."
-        )
-
-    conn_str = (
-        f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};UID={username};PWD={password};"
-        "TrustServerCertificate=yes"
-    )
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a fetched frame in place: integer columns to the smallest integer
+    dtype, low-cardinality text columns to category.
+    """
+    if df.empty:
+        return df
+    for pos in range(df.shape[1]):
+        col = df.iloc[:, pos]
+        if pd.api.types.is_integer_dtype(col):
+            df.isetitem(pos, pd.to_numeric(col, downcast="integer"))
+        elif col.dtype == object and pd.api.types.infer_dtype(col, skipna=True) == "string":
+            if col.nunique(dropna=True) / len(col) < 0.5:
+                df.isetitem(pos, col.astype("category"))
+    return df
+
+
+def _categorize_kpi_feed(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the KPI feed's label columns as category; Alert is kept as plain strings."""
+    cols = {c: "category" for c in KPI_CATEGORY_COLS if c in df.columns}
+    if "Alert" in df.columns and isinstance(df["Alert"].dtype, pd.CategoricalDtype):
+        # _downcast may have categorized it on a SQL-shaped feed.
+        cols["Alert"] = object
+    return df.astype(cols) if cols else df
+
+
+def get_db_connection(database: str):
+    """
+    Check out a pooled DBAPI connection (autocommit) from the shared engine.
+    Callers must close() it to return it to the pool.
+    """
+    # Deferred: SQLAlchemy/pyodbc are only needed when querying (not for --sample).
+    from DatabaseConnections.ConnectToLMSMaster import get_engine
+
     LOGGER.info("Connecting to %s", database)
-    return pyodbc.connect(conn_str, autocommit=True)
+    return get_engine(database, isolation_level="AUTOCOMMIT").raw_connection()
+
+
+@lru_cache(maxsize=4)
+def _read_sql(path_str: str, mtime_ns: int) -> str:
+    """Read a SQL script once per file version (`mtime_ns` is only a cache key)."""
+    return Path(path_str).read_text(encoding="utf-8")
 
 
 def fetch_kpi_metrics(sql_path: Path = SQL_FILE, database: str = "LMSMaster") -> pd.DataFrame:
     if not sql_path.exists():
         raise FileNotFoundError(f"SQL file not found: {sql_path}")
 
-    sql_script = sql_path.read_text(encoding="utf-8")
-    with get_db_connection(database=database) as conn:
+    sql_script = _read_sql(str(sql_path), sql_path.stat().st_mtime_ns)
+    conn = get_db_connection(database=database)
+    try:
         cur = conn.cursor()
+        cur.arraysize = FETCH_CHUNK_ROWS
         LOGGER.info("Executing %s", sql_path)
         cur.execute(sql_script)
         result_sets = list(_yield_result_sets(cur))
         if not result_sets:
             raise RuntimeError("SQL script produced no result sets.")
         # Your `sql/kpi_metrics.sql` ends with the rollup SELECT, so the last set is the one we want.
-        return result_sets[-1]
+        return _downcast(result_sets[-1])
+    finally:
+        conn.close()
 
 
 def _looks_like_kpi_feed(df: pd.DataFrame) -> bool:
@@ -119,111 +134,57 @@ def _looks_like_kpi_feed(df: pd.DataFrame) -> bool:
     return {"Metric", "Value", "Alert"}.issubset(cols) and ("GroupName" in cols or "Group" in cols)
 
 
-def _format_int(x) -> str:
+def _activity_dates(df: pd.DataFrame) -> pd.Series:
+    """ActivityDate as datetime64; the driver often returns it typed already, so only parse otherwise."""
+    col = df["ActivityDate"]
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    return pd.to_datetime(col, errors="coerce", cache=True)
+
+
+_WEEKDAY_IDX = {
+    "mon": 0,
+    "monday": 0,
+    "tue": 1,
+    "tues": 1,
+    "tuesday": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "thu": 3,
+    "thur": 3,
+    "thurs": 3,
+    "thursday": 3,
+    "fri": 4,
+    "friday": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sun": 6,
+    "sunday": 6,
+}
+
+
+@lru_cache(maxsize=1)
+def _excluded_weekdays() -> frozenset[int]:
+    """AcceptCount `dynamic.exclude_weekdays` as weekday indexes (config is static per process)."""
+    if not callable(get_thresholds):
+        return frozenset()
+    excluded: set[int] = set()
     try:
-        return f"{int(x):,}"
+        th = get_thresholds("AcceptCount") or {}
+        dyn = th.get("dynamic") or {}
+        raw_days = dyn.get("exclude_weekdays") or []
+        if isinstance(raw_days, list):
+            for d in raw_days:
+                if isinstance(d, int) and 0 <= d <= 6:
+                    excluded.add(d)
+                else:
+                    idx = _WEEKDAY_IDX.get(str(d).strip().lower())
+                    if idx is not None:
+                        excluded.add(idx)
     except Exception:
-        return str(x)
-
-
-def _format_pct_from_decimal(x) -> str:
-    """Assumes x is a decimal (e.g., 0.2037) and formats as 20.37%."""
-    try:
-        return f"{float(x) * 100.0:.2f}%"
-    except Exception:
-        return str(x)
-
-
-def _to_kpi_feed(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Convert a 'wide' daily metrics table (e.g., ActivityDate/Seen/Scored/Accepted/...)
-    into the row-based KPI feed consumed by the Streamlit dashboard.
-    """
-    if df.empty:
-        return pd.DataFrame(columns=["GroupName", "Metric", "Value", "Alert", "Link", "UpdatedAt"])
+        return frozenset()
+    return frozenset(excluded)
 
-    cols = set(df.columns)
-    if "ActivityDate" in cols:
-        tmp = df.copy()
-        tmp["ActivityDate"] = pd.to_datetime(tmp["ActivityDate"], errors="coerce")
-        tmp = tmp.sort_values(by="ActivityDate")
-        latest = tmp.tail(1).iloc[0]
-        updated_at = latest.get("ActivityDate")
-    else:
-        latest = df.iloc[0]
-        updated_at = None
-
-    def alert_for_count(v) -> str:
-        try:
-            n = float(v)
-            if n <= 0:
-                return "Red"
-            return "Green"
-        except Exception:
-            return "Yellow"
-
-    def alert_for_accepted(v) -> str:
-        """
-        Accept Count thresholding (mirrors NotazoSystemAlerts logic at a high level):
-        - Red if Accepted <= lower_threshold
-        - Green otherwise
-        - Fall back to >0 logic if thresholds aren't available
-        """
-        try:
-            n = float(v)
-        except Exception:
-            return "Yellow"
-
-        if callable(get_threshold_value):
-            lower = get_threshold_value("AcceptCount", "lower_threshold", default=None)
-            try:
-                if lower is not None and n <= float(lower):
-                    return "Red"
-            except Exception:
-                # If config value is malformed, ignore and fall back.
-                pass
-
-        return "Red" if n <= 0 else "Green"
-
-    rows: list[dict] = []
-
-    # Start with the three KPIs you can reliably track now.
-    for col in ("Seen", "Scored", "Accepted"):
-        if col in cols:
-            alert = alert_for_accepted(latest.get(col)) if col == "Accepted" else alert_for_count(latest.get(col))
-            rows.append(
-                {
-                    "GroupName": "Sales",
-                    "Metric": col,
-                    "Value": _format_int(latest.get(col)),
-                    "Alert": alert,
-                    "Link": None,
-                    "UpdatedAt": updated_at,
-                }
-            )
-
-    # Optional extra rates if your query includes them (kept for future expansion).
-    rate_cols = [
-        ("ScoringRate", "Scoring Rate"),
-        ("AcceptRate", "Accept Rate"),
-        ("ConvRate", "Conversion Rate"),
-        ("BidRate", "Bid Rate"),
-        ("WinRate", "Win Rate"),
-    ]
-    for col, label in rate_cols:
-        if col in cols:
-            rows.append(
-                {
-                    "GroupName": "Sales",
-                    "Metric": label,
-                    "Value": _format_pct_from_decimal(latest.get(col)),
-                    "Alert": "Green",
-                    "Link": None,
-                    "UpdatedAt": updated_at,
-                }
-            )
-
-    return pd.DataFrame(rows)
 
 def _aggregate_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -237,85 +198,58 @@ def _aggregate_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
     sums = ["Seen", "Scored", "Accepted", "Originated", "Bids", "LoansFunded"]
 
     out: dict[str, float | str | int] = {}
-    avg_df = df.copy()
-
-    def _weekday_name_to_idx(name: str) -> int | None:
-        mapping = {
-            "mon": 0,
-            "monday": 0,
-            "tue": 1,
-            "tues": 1,
-            "tuesday": 1,
-            "wed": 2,
-            "wednesday": 2,
-            "thu": 3,
-            "thur": 3,
-            "thurs": 3,
-            "thursday": 3,
-            "fri": 4,
-            "friday": 4,
-            "sat": 5,
-            "saturday": 5,
-            "sun": 6,
-            "sunday": 6,
-        }
-        return mapping.get(str(name).strip().lower())
+    # Rows used for the averages; None means every row.
+    avg_mask: pd.Series | None = None
 
     if "ActivityDate" in df.columns:
-        dates = pd.to_datetime(df["ActivityDate"], errors="coerce").dropna()
+        activity = _activity_dates(df)
+        dates = activity.dropna()
         if not dates.empty:
             out["ActivityStart"] = dates.min().date().isoformat()
             out["ActivityEnd"] = dates.max().date().isoformat()
             out["Days"] = int(dates.nunique())
 
         # Shared config-driven weekday exclusions for legacy averages.
-        excluded_weekdays: set[int] = set()
-        if callable(get_thresholds):
-            try:
-                th = get_thresholds("AcceptCount") or {}
-                dyn = th.get("dynamic") or {}
-                raw_days = dyn.get("exclude_weekdays") or []
-                if isinstance(raw_days, list):
-                    for d in raw_days:
-                        if isinstance(d, int) and 0 <= d <= 6:
-                            excluded_weekdays.add(d)
-                        else:
-                            idx = _weekday_name_to_idx(str(d))
-                            if idx is not None:
-                                excluded_weekdays.add(idx)
-            except Exception:
-                excluded_weekdays = set()
+        excluded_weekdays = _excluded_weekdays()
 
         if excluded_weekdays:
-            avg_df = avg_df.copy()
-            avg_df["ActivityDate"] = pd.to_datetime(avg_df["ActivityDate"], errors="coerce")
-            avg_df = avg_df[avg_df["ActivityDate"].notna()]
-            avg_df = avg_df[~avg_df["ActivityDate"].dt.dayofweek.isin(excluded_weekdays)]
-            if avg_df.empty:
-                # Fall back to full set so output is never blank.
-                avg_df = df.copy()
-
+            mask = activity.notna() & ~activity.dt.dayofweek.isin(excluded_weekdays)
+            # Fall back to full set so output is never blank.
+            if mask.any():
+                avg_mask = mask
+
+    # Coerce every column used below once; the weekday-filtered view reuses the
+    # same numeric frame instead of re-parsing its columns.
+    # Columns the driver already typed as numeric skip to_numeric entirely.
+    numeric_cols = [c for c in (*sums, *COST_COLS) if c in df.columns]
+    num = df[numeric_cols]
+    to_coerce = [c for c in numeric_cols if not pd.api.types.is_numeric_dtype(num[c])]
+    if to_coerce:
+        num = num.assign(**{c: pd.to_numeric(num[c], errors="coerce") for c in to_coerce})
+    avg_num = num if avg_mask is None else num[avg_mask.to_numpy()]
+
+    # sum() skips NaN (0 when all missing), so no fillna(0) copy is needed.
     for col in sums:
-        if col in df.columns:
-            out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).sum()
+        if col in num.columns:
+            out[col] = num[col].sum()
 
     # Rate metrics should be computed as weighted ratios from aggregated counts,
     # not simple mean of daily rates.
     def _sum_col(name: str, frame: pd.DataFrame) -> float:
         if name not in frame.columns:
             return 0.0
-        return float(pd.to_numeric(frame[name], errors="coerce").fillna(0).sum())
+        return float(frame[name].sum())
 
     def _ratio(numerator: float, denominator: float) -> float | None:
         if denominator == 0:
             return None
         return numerator / denominator
 
-    seen_sum = _sum_col("Seen", avg_df)
-    scored_sum = _sum_col("Scored", avg_df)
-    accepted_sum = _sum_col("Accepted", avg_df)
-    originated_sum = _sum_col("Originated", avg_df)
-    bids_sum = _sum_col("Bids", avg_df)
+    seen_sum = _sum_col("Seen", avg_num)
+    scored_sum = _sum_col("Scored", avg_num)
+    accepted_sum = _sum_col("Accepted", avg_num)
+    originated_sum = _sum_col("Originated", avg_num)
+    bids_sum = _sum_col("Bids", avg_num)
 
     out["AcceptRate"] = _ratio(accepted_sum, seen_sum)
     out["ScoringRate"] = _ratio(scored_sum, seen_sum)
@@ -324,68 +258,54 @@ def _aggregate_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
     out["ConvRate"] = _ratio(originated_sum, accepted_sum)
 
     # Keep cost fields as simple mean over filtered days for now.
-    for col in ("ScoringCost", "BidCost"):
-        if col in avg_df.columns:
-            out[col] = pd.to_numeric(avg_df[col], errors="coerce").mean()
+    for col in COST_COLS:
+        if col in avg_num.columns:
+            out[col] = avg_num[col].mean()
 
     return pd.DataFrame([out])
 
 def sample_kpi_metrics() -> pd.DataFrame:
     # Keep consistent with Streamlit dashboard expected columns
     return pd.DataFrame(
-        [
-            {
-                "GroupName": "Sales",
-                "Metric": "Accept Count",
-                "Value": "1,284",
-                "Alert": "Green",
-                "Link": "https://example.com/accept-count",
-            },
-            {
-                "GroupName": "Sales",
-                "Metric": "Conversion Rate",
-                "Value": "9.2%",
-                "Alert": "Green",
-                "Link": "https://example.com/conversion-rate",
-            },
-            {
-                "GroupName": "Performance",
-                "Metric": "ACH Return Rate",
-                "Value": "2.4%",
-                "Alert": "Red",
-                "Link": "https://reports.speedyloan.com/single/?appid=f9a3184e-f3e8-4fab-94fa-373a0f869114&obj=36bfd39d-16a2-4b83-88a1-0a5fdb7f7f72&theme=sense&bookmark=06cc43dc-cb1b-4466-b0a3-d60246ef27cf&opt=ctxmenu,currsel",
-            },
-            {
-                "GroupName": "Performance",
-                "Metric": "First Payment Default - FA%",
-                "Value": "6.1%",
-                "Alert": "Yellow",
-                "Link": "https://example.com/fpd-fa",
-            },
-            {
-                "GroupName": "Performance",
-                "Metric": "Avg Payin",
-                "Value": "1.18",
-                "Alert": "Red",
-                "Link": "https://example.com/payin",
-            },
-        ]
+        {
+            "GroupName": ["Sales", "Sales", "Performance", "Performance", "Performance"],
+            "Metric": [
+                "Accept Count",
+                "Conversion Rate",
+                "ACH Return Rate",
+                "First Payment Default - FA%",
+                "Avg Payin",
+            ],
+            "Value": ["1,284", "9.2%", "2.4%", "6.1%", "1.18"],
+            "Alert": ["Green", "Green", "Red", "Yellow", "Red"],
+            "Link": [
+                "https://example.com/accept-count",
+                "https://example.com/conversion-rate",
+                "https://reports.speedyloan.com/single/?appid=f9a3184e-f3e8-4fab-94fa-373a0f869114&obj=36bfd39d-16a2-4b83-88a1-0a5fdb7f7f72&theme=sense&bookmark=06cc43dc-cb1b-4466-b0a3-d60246ef27cf&opt=ctxmenu,currsel",
+                "https://example.com/fpd-fa",
+                "https://example.com/payin",
+            ],
+        }
     )
 
 
-def write_kpis(df: pd.DataFrame, output_csv: Path = OUTPUT_CSV) -> Path:
-    output_csv.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_csv, index=False)
-    LOGGER.info("Wrote %s (%d rows)", output_csv, len(df))
-    return output_csv
+def write_kpis(df: pd.DataFrame, output_path: Path = OUTPUT_PARQUET, fmt: str = "parquet") -> Path:
+    written = write_frame(df, output_path, fmt=fmt)
+    LOGGER.info("Wrote %s (%d rows)", written, len(df))
+    return written
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Refresh KPI metrics into a local CSV for the dashboard.")
+    parser = argparse.ArgumentParser(description="Refresh KPI metrics into a local file for the dashboard.")
     parser.add_argument("--database", default="LMSMaster", help="SQL Server database name")
     parser.add_argument("--sql", default=str(SQL_FILE), help="Path to SQL file")
-    parser.add_argument("--output", default=str(OUTPUT_CSV), help="Path to output CSV")
-    parser.add_argument("--raw-output", default=str(RAW_OUTPUT_CSV), help="Path to raw output CSV (debugging/validation)")
+    parser.add_argument("--output", default=str(OUTPUT_PARQUET), help="Path to output file (suffix follows --format)")
+    parser.add_argument(
+        "--raw-output",
+        default=str(RAW_OUTPUT_PARQUET),
+        help="Path to raw output file (debugging/validation; suffix follows --format)",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="parquet", help="Output format (csv for humans)")
     parser.add_argument("--sample", action="store_true", help="Write sample KPIs instead of querying SQL")
     args = parser.parse_args()
 
@@ -395,17 +315,17 @@ def main() -> None:
         raw_df = fetch_kpi_metrics(sql_path=Path(args.sql), database=args.database)
 
         # Always keep a local copy of the raw query result for validation/debugging.
-        Path(args.raw_output).parent.mkdir(parents=True, exist_ok=True)
-        raw_df.to_csv(Path(args.raw_output), index=False)
-        LOGGER.info("Wrote %s (%d rows)", args.raw_output, len(raw_df))
+        raw_written = write_frame(raw_df, Path(args.raw_output), fmt=args.format)
+        LOGGER.info("Wrote %s (%d rows)", raw_written, len(raw_df))
 
         if _looks_like_kpi_feed(raw_df):
             kpi_df = raw_df.copy()
         else:
-            # For the current MVP, write an aggregated daily summary to kpi_metrics.csv.
+            # For the current MVP, write an aggregated daily summary to kpi_metrics.
             kpi_df = _aggregate_daily_metrics(raw_df)
 
-    write_kpis(kpi_df, output_csv=Path(args.output))
+    kpi_df = _categorize_kpi_feed(kpi_df)
+    write_kpis(kpi_df, output_path=Path(args.output), fmt=args.format)
 
 
 if __name__ == "__main__":
@@ -4,27 +4,17 @@ import argparse
 import sys
 from datetime import date, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from sql_operations.accept_count_operation import (
-    backfill_accept_count_daily_from_db,
-    run_accept_count,
-    summarize_accept_count_from_proc,
-)
-from sql_operations.originated_count_operation import (
-    backfill_originated_count_daily_from_proc,
-    run_originated_count,
-    summarize_originated_count_from_proc,
-)
-from sql_operations.normalize import (
-    append_history_rows,
-    apply_history_retention,
-    build_windowed_serving_snapshot,
-    make_kpi_row,
-)
+# The sql_operations modules pull in pandas, SQLAlchemy and pyodbc; they are
+# imported where used so `--help` and argument errors return immediately.
 from scripts.logging_utils import setup_logger
 
 LOGGER = setup_logger(__name__, "run_all")
@@ -37,19 +27,29 @@ def _build_accept_count_rows(
     backfill_days: int,
     date_range: int,
     time_range: int,
-) -> list[dict]:
-    rows: list[dict] = []
+    proc_result_sets: list[pd.DataFrame],
+) -> pd.DataFrame:
+    import pandas as pd
+
+    from sql_operations.accept_count_operation import (
+        backfill_accept_count_daily_from_db,
+        summarize_accept_count_from_proc,
+    )
+    from sql_operations.normalize import make_kpi_frame, make_kpi_row
+
+    frames: list[pd.DataFrame] = []
 
     if backfill_days > 0:
         backfill_df = backfill_accept_count_daily_from_db(days=backfill_days)
-        for _, row in backfill_df.iterrows():
-            rows.append(
-                make_kpi_row(
-                    as_of_date=row["as_of_date"],
+        if not backfill_df.empty:
+            # One column-wise frame for the whole series, not a dict per day.
+            frames.append(
+                make_kpi_frame(
+                    as_of_dates=backfill_df["as_of_date"],
                     section="sales",
                     metric_key="AcceptCount",
                     metric_label="Accept Count",
-                    value=int(row["AcceptCount"]),
+                    values=backfill_df["AcceptCount"].astype("int64").to_numpy(),
                     window_days=1,
                     value_type="count",
                     source="accept_count_backfill_db",
@@ -57,22 +57,28 @@ def _build_accept_count_rows(
             )
         LOGGER.info("Prepared %d backfill rows from DB.", len(backfill_df))
 
-    proc_summary = summarize_accept_count_from_proc(date_range=date_range, time_range=time_range)
+    proc_summary = summarize_accept_count_from_proc(
+        date_range=date_range, time_range=time_range, result_sets=proc_result_sets
+    )
     proc_as_of = date.today() - timedelta(days=1)
-    rows.append(
-        make_kpi_row(
-            as_of_date=proc_as_of,
-            section="sales",
-            metric_key="AcceptCount",
-            metric_label="Accept Count",
-            value=proc_summary["accept_count"],
-            window_days=1,
-            value_type="count",
-            source=proc_summary["source"],
+    frames.append(
+        pd.DataFrame(
+            [
+                make_kpi_row(
+                    as_of_date=proc_as_of,
+                    section="sales",
+                    metric_key="AcceptCount",
+                    metric_label="Accept Count",
+                    value=proc_summary["accept_count"],
+                    window_days=1,
+                    value_type="count",
+                    source=proc_summary["source"],
+                )
+            ]
         )
     )
     LOGGER.info("Prepared current Accept Count snapshot for %s.", proc_as_of.isoformat())
-    return rows
+    return pd.concat(frames, ignore_index=True)
 
 
 def _build_originated_count_rows(
@@ -81,19 +87,31 @@ def _build_originated_count_rows(
     start_num: int,
     end_num: int,
     days: int,
-) -> list[dict]:
-    rows: list[dict] = []
+    fetch_proc: Callable[[int, int, int], list[pd.DataFrame]],
+) -> pd.DataFrame:
+    import pandas as pd
+
+    from sql_operations.normalize import make_kpi_frame, make_kpi_row
+    from sql_operations.originated_count_operation import (
+        backfill_originated_count_daily_from_proc,
+        daily_proc_params,
+        summarize_originated_count_from_proc,
+    )
+
+    frames: list[pd.DataFrame] = []
 
     if backfill_days > 0:
-        backfill_df = backfill_originated_count_daily_from_proc(days=backfill_days)
-        for _, row in backfill_df.iterrows():
-            rows.append(
-                make_kpi_row(
-                    as_of_date=row["as_of_date"],
+        backfill_df = backfill_originated_count_daily_from_proc(
+            days=backfill_days, result_sets=fetch_proc(*daily_proc_params(backfill_days))
+        )
+        if not backfill_df.empty:
+            frames.append(
+                make_kpi_frame(
+                    as_of_dates=backfill_df["as_of_date"],
                     section="sales",
                     metric_key="OriginatedCount",
                     metric_label="Originated Count",
-                    value=int(row["OriginatedCount"]),
+                    values=backfill_df["OriginatedCount"].astype("int64").to_numpy(),
                     window_days=1,
                     value_type="count",
                     source="originated_count_backfill_proc",
@@ -101,22 +119,31 @@ def _build_originated_count_rows(
             )
         LOGGER.info("Prepared %d Originated Count backfill rows from proc.", len(backfill_df))
 
-    proc_summary = summarize_originated_count_from_proc(start_num=start_num, end_num=end_num, days=days)
+    proc_summary = summarize_originated_count_from_proc(
+        start_num=start_num,
+        end_num=end_num,
+        days=days,
+        result_sets=fetch_proc(*daily_proc_params(max(days, 2))),
+    )
     proc_as_of = str(proc_summary.get("as_of_date") or (date.today() - timedelta(days=1)).isoformat())
-    rows.append(
-        make_kpi_row(
-            as_of_date=proc_as_of,
-            section="sales",
-            metric_key="OriginatedCount",
-            metric_label="Originated Count",
-            value=proc_summary["originated_count"],
-            window_days=1,
-            value_type="count",
-            source=proc_summary["source"],
+    frames.append(
+        pd.DataFrame(
+            [
+                make_kpi_row(
+                    as_of_date=proc_as_of,
+                    section="sales",
+                    metric_key="OriginatedCount",
+                    metric_label="Originated Count",
+                    value=proc_summary["originated_count"],
+                    window_days=1,
+                    value_type="count",
+                    source=proc_summary["source"],
+                )
+            ]
         )
     )
     LOGGER.info("Prepared current Originated Count snapshot for %s.", proc_as_of)
-    return rows
+    return pd.concat(frames, ignore_index=True)
 
 
 def main() -> None:
@@ -177,29 +204,57 @@ def main() -> None:
     args = parser.parse_args()
     windows = tuple(int(x.strip()) for x in args.windows.split(",") if x.strip())
 
+    from sql_operations.accept_count_operation import fetch_accept_count_result_sets, run_accept_count
+    from sql_operations.normalize import (
+        append_history_rows,
+        apply_history_retention,
+        build_windowed_serving_snapshot,
+    )
+    from sql_operations.originated_count_operation import fetch_originated_count_result_sets, run_originated_count
+
+    # Each proc runs once per distinct argument set in this run: the raw dump, the
+    # snapshot summary and the backfill are handed the same result sets where they match.
+    accept_result_sets = fetch_accept_count_result_sets(date_range=args.date_range, time_range=args.time_range)
+    originated_calls: dict[tuple[int, int, int], list[pd.DataFrame]] = {}
+
+    def _originated_result_sets(start_num: int, end_num: int, days: int) -> list[pd.DataFrame]:
+        key = (start_num, end_num, days)
+        if key not in originated_calls:
+            originated_calls[key] = fetch_originated_count_result_sets(*key)
+        return originated_calls[key]
+
+    originated_start = max(args.originated_start_num, 0)
+    originated_end = max(args.originated_end_num, 0)
+    originated_days = max(args.originated_days, 0)
+
     # Step 1: Keep raw procedure outputs for traceability/debugging.
-    raw_accept_files = run_accept_count(date_range=args.date_range, time_range=args.time_range)
+    raw_accept_files = run_accept_count(result_sets=accept_result_sets)
     LOGGER.info("Wrote %d raw Accept Count output files.", len(raw_accept_files))
     raw_originated_files = run_originated_count(
-        start_num=max(args.originated_start_num, 0),
-        end_num=max(args.originated_end_num, 0),
-        days=max(args.originated_days, 0),
+        result_sets=_originated_result_sets(originated_start, originated_end, originated_days)
     )
     LOGGER.info("Wrote %d raw Originated Count output files.", len(raw_originated_files))
 
     # Step 2: Normalize and store history/snapshot.
-    rows = _build_accept_count_rows(
-        backfill_days=max(args.backfill_days, 0),
-        date_range=args.date_range,
-        time_range=args.time_range,
-    )
-    rows.extend(
-        _build_originated_count_rows(
-            backfill_days=max(args.backfill_days, 0),
-            start_num=max(args.originated_start_num, 0),
-            end_num=max(args.originated_end_num, 0),
-            days=max(args.originated_days, 0),
-        )
+    import pandas as pd
+
+    rows = pd.concat(
+        [
+            _build_accept_count_rows(
+                backfill_days=max(args.backfill_days, 0),
+                date_range=args.date_range,
+                time_range=args.time_range,
+                proc_result_sets=accept_result_sets,
+            ),
+            _build_originated_count_rows(
+                backfill_days=max(args.backfill_days, 0),
+                start_num=originated_start,
+                end_num=originated_end,
+                days=originated_days,
+                fetch_proc=_originated_result_sets,
+            ),
+        ],
+        ignore_index=True,
     )
     history_df = append_history_rows(args.history_output, rows)
     history_df = apply_history_retention(
@@ -17,6 +17,12 @@ from typing import Any, Dict
 
 import yaml
 
+try:
+    # LibYAML bindings parse several times faster than the pure-Python loader.
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _SafeLoader  # type: ignore
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_PATH = REPO_ROOT / "config" / "config.yaml"
 KPI_REGISTRY_PATH = REPO_ROOT / "config" / "kpi_registry.yaml"
@@ -28,7 +34,7 @@ def config() -> Dict[str, Any]:
     if not CONFIG_PATH.exists():
         return {}
     raw = CONFIG_PATH.read_text(encoding="utf-8")
-    data = yaml.safe_load(raw)
+    data = yaml.load(raw, Loader=_SafeLoader)
     return data or {}
 
 
@@ -38,7 +44,7 @@ def kpi_registry() -> Dict[str, Any]:
     if not KPI_REGISTRY_PATH.exists():
         return {}
     raw = KPI_REGISTRY_PATH.read_text(encoding="utf-8")
-    data = yaml.safe_load(raw)
+    data = yaml.load(raw, Loader=_SafeLoader)
     return data or {}
 
 
@@ -51,8 +57,9 @@ def kpi_registry_metrics() -> list[dict[str, Any]]:
     return [r for r in rows if isinstance(r, dict)]
 
 
+@lru_cache(maxsize=64)
 def get_thresholds(alert_key: str) -> Dict[str, Any]:
-    """Return the thresholds block for a given alert key."""
+    """Return the thresholds block for a given alert key (cached like config())."""
     cfg = config()
     return (
         cfg.get("alerts", {})
@@ -62,6 +69,7 @@ def get_thresholds(alert_key: str) -> Dict[str, Any]:
     )
 
 
+@lru_cache(maxsize=64)
 def threshold_mode(alert_key: str, default: str = "static") -> str:
     """Return thresholds.mode for an alert key (e.g. 'static' or 'dynamic')."""
     thresholds = get_thresholds(alert_key)
@@ -69,13 +77,23 @@ def threshold_mode(alert_key: str, default: str = "static") -> str:
     return str(mode) if mode is not None else default
 
 
+_MISSING = object()
+
+
 def get_threshold_value(alert_key: str, name: str, default: Any = None) -> Any:
     """
     Convenience helper:
     Looks up thresholds[mode][name] using the configured mode.
     """
+    value = _threshold_value(alert_key, name)
+    return default if value is _MISSING else value
+
+
+@lru_cache(maxsize=256)
+def _threshold_value(alert_key: str, name: str) -> Any:
+    # `default` stays out of the cache key so callers may pass unhashable defaults.
     thresholds = get_thresholds(alert_key)
     mode = threshold_mode(alert_key)
     mode_cfg = thresholds.get(mode) or {}
-    return mode_cfg.get(name, default)
+    return mode_cfg.get(name, _MISSING)
 
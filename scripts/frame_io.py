@@ -0,0 +1,95 @@
+"""
+Refresh-output I/O helpers.
+
+Frames are written as Parquet (zstd) next to their CSV path, with CSV kept as
+a human-friendly fallback. Readers take whichever sibling was written last, so
+switching a job between formats never serves a stale file.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type: ignore
+
+FORMATS = ("parquet", "csv")
+
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str = "parquet") -> Path:
+    """
+    Write `df` to `path` with the suffix for `fmt` and return the written path.
+    Falls back to CSV when pyarrow is not installed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "parquet" and pyarrow is not None:
+        target = path.with_suffix(".parquet")
+        df.to_parquet(target, engine="pyarrow", compression="zstd", index=False)
+        return target
+    target = path.with_suffix(".csv")
+    df.to_csv(target, index=False)
+    return target
+
+
+def write_csv_with_parquet(df: pd.DataFrame, csv_path: Path) -> Path:
+    """
+    Write `csv_path` and, when pyarrow is available, a Parquet copy beside it.
+    The Parquet copy is written last so readers pick it up as the newest sibling.
+    """
+    write_frame(df, csv_path, fmt="csv")
+    if pyarrow is not None:
+        write_frame(df, csv_path, fmt="parquet")
+    return csv_path
+
+
+def latest_frame_path(path: Path) -> Path | None:
+    """Return the newest existing Parquet/CSV sibling of `path` (Parquet wins ties)."""
+    candidates = [path.with_suffix(".csv")]
+    if pyarrow is not None:
+        candidates.insert(0, path.with_suffix(".parquet"))
+    existing = [p for p in candidates if p.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda p: p.stat().st_mtime_ns)
+
+
+def read_frame(path: Path, columns: tuple[str, ...] | None = None) -> pd.DataFrame | None:
+    """
+    Read the newest Parquet/CSV sibling of `path`, or None if neither exists.
+    `columns` limits the read to those columns; names absent from the file are skipped.
+    """
+    target = latest_frame_path(path)
+    if target is None:
+        return None
+    return read_frame_file(target, columns)
+
+
+def read_frame_file(path: Path, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """
+    Read one Parquet/CSV file.
+    - `columns` limits the read to those columns; names absent from the file are skipped.
+    - Projected CSV reads use the pyarrow engine when it is installed.
+    """
+    if path.suffix == ".parquet":
+        if columns is not None:
+            import pyarrow.parquet as pq
+
+            present = set(pq.read_schema(path).names)
+            return pd.read_parquet(path, engine="pyarrow", columns=[c for c in columns if c in present])
+        return pd.read_parquet(path, engine="pyarrow")
+
+    if columns is not None and pyarrow is not None:
+        # Projected reads name every column they use, so the multi-threaded Arrow
+        # parser is safe here; it needs a concrete usecols list, not a callable.
+        header = set(pd.read_csv(path, nrows=0).columns)
+        return pd.read_csv(path, engine="pyarrow", usecols=[c for c in columns if c in header])
+    if columns is not None:
+        wanted = set(columns)
+        return pd.read_csv(path, usecols=lambda c: c in wanted)
+    return pd.read_csv(path)
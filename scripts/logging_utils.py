@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 LOG_DIR = REPO_ROOT / "logs"
 
+# One queue + background listener per log file stem; loggers sharing a stem
+# enqueue into the same listener so the file is only opened once.
+_QUEUES: dict[str, queue.Queue] = {}
+
 
 def _resolve_level(default: str = "INFO") -> int:
     level_name = str(os.getenv("LOG_LEVEL", default)).strip().upper()
@@ -19,21 +25,33 @@ def setup_logger(name: str, log_file_stem: str, *, level: int | None = None) ->
     Configure a module logger with:
     - console output
     - daily rotating file output under ./logs
+    Records are handed to a background QueueListener, so callers never block
+    on console or file I/O.
     """
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger
 
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    logger.setLevel(level or _resolve_level())
+    resolved_level = level or _resolve_level()
+    logger.setLevel(resolved_level)
     logger.propagate = False
 
+    log_queue = _QUEUES.get(log_file_stem)
+    if log_queue is None:
+        log_queue = _QUEUES[log_file_stem] = queue.Queue(-1)
+        _start_listener(log_queue, log_file_stem, resolved_level)
+    logger.addHandler(QueueHandler(log_queue))
+
+    return logger
+
+
+def _start_listener(log_queue: queue.Queue, log_file_stem: str, level: int) -> None:
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
     formatter = logging.Formatter("%(asctime)s [%(levelname)s] [%(name)s] %(message)s")
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    stream_handler.setLevel(level or _resolve_level())
-    logger.addHandler(stream_handler)
+    stream_handler.setLevel(level)
 
     file_handler = TimedRotatingFileHandler(
         filename=str(LOG_DIR / f"{log_file_stem}.log"),
@@ -43,7 +61,9 @@ def setup_logger(name: str, log_file_stem: str, *, level: int | None = None) ->
         encoding="utf-8",
     )
     file_handler.setFormatter(formatter)
-    file_handler.setLevel(level or _resolve_level())
-    logger.addHandler(file_handler)
+    file_handler.setLevel(level)
 
-    return logger
+    listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    # Drain pending records and close the file on interpreter exit.
+    atexit.register(listener.stop)
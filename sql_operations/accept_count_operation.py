@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import argparse
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
 
 from DatabaseConnections.ConnectToLMSMaster import ConnectToLMSMaster
+from scripts.frame_io import write_frame
 from scripts.logging_utils import setup_logger
 
 LOGGER = setup_logger(__name__, "accept_count_operation")
@@ -16,17 +18,27 @@ OUTPUT_DIR = REPO_ROOT / "data" / "refresh"
 STORED_PROCEDURE = "EXEC USP_SystemAlert_AcceptCountProcedure ?, ?"
 
 
+@lru_cache(maxsize=None)
+def _get_connector(database: str = "LMSMaster") -> ConnectToLMSMaster:
+    """One connector per database for the process; it shares the pooled engine."""
+    return ConnectToLMSMaster(database=database)
+
+
 def fetch_accept_count_result_sets(date_range: int = 3, time_range: int = 4) -> list[pd.DataFrame]:
-    dbconnector = ConnectToLMSMaster(database="LMSMaster")
+    dbconnector = _get_connector()
     return dbconnector.callStoredProcedure(STORED_PROCEDURE, date_range, time_range)
 
 
-def run_accept_count(date_range: int = 3, time_range: int = 4) -> list[Path]:
+def run_accept_count(
+    date_range: int = 3, time_range: int = 4, result_sets: list[pd.DataFrame] | None = None
+) -> list[Path]:
     """
     Execute AcceptCount stored procedure and persist result sets as CSV files.
+    Pass `result_sets` from an earlier fetch to skip executing the proc again.
     Returns written file paths.
     """
-    result_sets = fetch_accept_count_result_sets(date_range=date_range, time_range=time_range)
+    if result_sets is None:
+        result_sets = fetch_accept_count_result_sets(date_range=date_range, time_range=time_range)
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     outputs = [
@@ -40,7 +52,7 @@ def run_accept_count(date_range: int = 3, time_range: int = 4) -> list[Path]:
             target = outputs[idx]
         else:
             target = OUTPUT_DIR / f"accept_count_result_set_{idx + 1}.csv"
-        df.to_csv(target, index=False)
+        write_frame(df, target, fmt="csv")
         LOGGER.info("Wrote %s (%d rows)", target, len(df))
         written.append(target)
 
@@ -50,12 +62,16 @@ def run_accept_count(date_range: int = 3, time_range: int = 4) -> list[Path]:
     return written
 
 
-def summarize_accept_count_from_proc(date_range: int = 3, time_range: int = 4) -> dict:
+def summarize_accept_count_from_proc(
+    date_range: int = 3, time_range: int = 4, result_sets: list[pd.DataFrame] | None = None
+) -> dict:
     """
     Return a normalized metric dict from procedure output.
     AcceptCount is the sum of ApplicationCount across providers.
+    Pass `result_sets` from an earlier fetch to skip executing the proc again.
     """
-    result_sets = fetch_accept_count_result_sets(date_range=date_range, time_range=time_range)
+    if result_sets is None:
+        result_sets = fetch_accept_count_result_sets(date_range=date_range, time_range=time_range)
     if len(result_sets) < 2 or result_sets[1].empty:
         raise RuntimeError("AcceptCount procedure did not return provider-level application counts.")
 
@@ -86,11 +102,11 @@ def backfill_accept_count_daily_from_db(days: int = 90) -> pd.DataFrame:
     GROUP BY CAST(A.ApplicationDate AS date)
     ORDER BY CAST(A.ApplicationDate AS date);
     """
-    dbconnector = ConnectToLMSMaster(database="LMSMaster")
+    dbconnector = _get_connector()
     df = dbconnector.callQuery(query, days)
     if df.empty:
         return df
-    df["as_of_date"] = pd.to_datetime(df["as_of_date"], errors="coerce").dt.date.astype(str)
+    df["as_of_date"] = pd.to_datetime(df["as_of_date"], errors="coerce").dt.strftime("%Y-%m-%d")
     df["AcceptCount"] = pd.to_numeric(df["AcceptCount"], errors="coerce").fillna(0).astype(int)
     return df
 
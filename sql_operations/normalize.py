@@ -4,8 +4,10 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
+from scripts.frame_io import read_frame, write_csv_with_parquet
 from sql_operations.thresholds import evaluate_thresholds_for_window
 
 
@@ -17,6 +19,58 @@ def _to_iso_date(value: date | datetime | str) -> str:
     return str(value)
 
 
+def _as_of_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse an as_of_date column once. History is stored as canonical ISO days,
+    so the ISO fast path applies; already-parsed columns are returned as is.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format="ISO8601", errors="coerce", cache=True)
+
+
+# Output columns of the serving snapshots (used to shape empty outputs).
+SERVING_SNAPSHOT_COLUMNS = (
+    "as_of_date",
+    "window_days",
+    "section",
+    "metric_key",
+    "metric_label",
+    "value",
+    "value_type",
+    "source",
+)
+WINDOWED_SNAPSHOT_COLUMNS = (
+    *SERVING_SNAPSHOT_COLUMNS,
+    "status",
+    "lower_threshold",
+    "upper_threshold",
+    "pct_change",
+    "seasonal_zscore",
+    "signal_count",
+    "signals",
+    "rolling_points_used",
+    "seasonal_points_used",
+    "weekday_filter_applied",
+    "refreshed_at",
+)
+
+# Small integer columns of history/serving frames, downcast before writing.
+_SMALL_INT_COLS = ("window_days", "signal_count", "rolling_points_used", "seasonal_points_used")
+
+
+def _shrink_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast the small integer columns (window_days, signal counts) to the
+    narrowest integer dtype before persisting. Values stay float64 and text
+    columns stay object so both Parquet and CSV siblings read back alike.
+    """
+    for col in _SMALL_INT_COLS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
 def make_kpi_row(
     *,
     as_of_date: date | datetime | str,
@@ -27,7 +81,9 @@ def make_kpi_row(
     window_days: int = 7,
     value_type: str = "count",
     source: str = "accept_count_proc",
+    refreshed_at: str | None = None,
 ) -> dict:
+    """Build one history row; batch callers pass a shared `refreshed_at` stamp."""
     return {
         "as_of_date": _to_iso_date(as_of_date),
         "window_days": int(window_days),
@@ -37,51 +93,94 @@ def make_kpi_row(
         "value": float(value),
         "value_type": value_type,
         "source": source,
-        "refreshed_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "refreshed_at": refreshed_at or datetime.utcnow().isoformat(timespec="seconds"),
     }
 
 
-def append_history_rows(history_csv: Path, rows: Iterable[dict]) -> pd.DataFrame:
+def make_kpi_frame(
+    *,
+    as_of_dates: Iterable[date | datetime | str],
+    section: str,
+    metric_key: str,
+    metric_label: str,
+    values: Iterable[float | int],
+    window_days: int = 7,
+    value_type: str = "count",
+    source: str = "accept_count_proc",
+    refreshed_at: str | None = None,
+) -> pd.DataFrame:
+    """
+    Column-wise counterpart of make_kpi_row for a whole backfill series:
+    one frame with the same columns, built from parallel date/value arrays.
+    """
+    dates = pd.Series(as_of_dates)
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        iso_dates = dates.dt.strftime("%Y-%m-%d")
+    else:
+        iso_dates = dates.map(_to_iso_date)
+    return pd.DataFrame(
+        {
+            "as_of_date": iso_dates.to_numpy(dtype=object),
+            "window_days": int(window_days),
+            "section": section,
+            "metric_key": metric_key,
+            "metric_label": metric_label,
+            "value": np.asarray(values, dtype="float64"),
+            "value_type": value_type,
+            "source": source,
+            "refreshed_at": refreshed_at or datetime.utcnow().isoformat(timespec="seconds"),
+        }
+    )
+
+
+def append_history_rows(history_csv: Path, rows: Iterable[dict] | pd.DataFrame) -> pd.DataFrame:
     history_csv.parent.mkdir(parents=True, exist_ok=True)
-    new_df = pd.DataFrame(list(rows))
+    new_df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
     if new_df.empty:
         return pd.DataFrame()
 
-    if history_csv.exists():
-        old_df = pd.read_csv(history_csv)
+    old_df = read_frame(history_csv)
+    if old_df is not None:
         all_df = pd.concat([old_df, new_df], ignore_index=True)
     else:
         all_df = new_df
 
     # Normalize dates to canonical YYYY-MM-DD so mixed formats
     # (e.g., 9/26/25 vs 2025-09-26) collapse to one logical day.
-    all_df["as_of_date"] = pd.to_datetime(all_df["as_of_date"], errors="coerce").dt.date
-    all_df = all_df[all_df["as_of_date"].notna()].copy()
-    all_df["as_of_date"] = all_df["as_of_date"].astype(str)
+    as_of = pd.to_datetime(all_df["as_of_date"], errors="coerce")
+    valid = as_of.notna().to_numpy()
+    all_df = all_df.loc[valid].assign(as_of_date=as_of[valid].dt.strftime("%Y-%m-%d"))
 
     # Deduplicate by natural key, keep latest write
     key_cols = ["as_of_date", "window_days", "section", "metric_key"]
     all_df = all_df.drop_duplicates(subset=key_cols, keep="last")
     all_df = all_df.sort_values(by=["as_of_date", "section", "metric_key", "window_days"]).reset_index(drop=True)
-    all_df.to_csv(history_csv, index=False)
+    write_csv_with_parquet(_shrink_history(all_df), history_csv)
     return all_df
 
 
 def build_serving_snapshot(history_df: pd.DataFrame, output_csv: Path) -> pd.DataFrame:
     output_csv.parent.mkdir(parents=True, exist_ok=True)
     if history_df.empty:
-        out = pd.DataFrame(
-            columns=["as_of_date", "window_days", "section", "metric_key", "metric_label", "value", "value_type", "source"]
-        )
-        out.to_csv(output_csv, index=False)
+        out = pd.DataFrame(columns=list(SERVING_SNAPSHOT_COLUMNS))
+        write_csv_with_parquet(out, output_csv)
         return out
 
     # Keep latest as_of_date per (window_days, section, metric_key)
-    history_df = history_df.copy()
-    history_df["as_of_date_dt"] = pd.to_datetime(history_df["as_of_date"], errors="coerce")
-    idx = history_df.groupby(["window_days", "section", "metric_key"])["as_of_date_dt"].idxmax()
-    out = history_df.loc[idx].drop(columns=["as_of_date_dt"]).reset_index(drop=True)
-    out.to_csv(output_csv, index=False)
+    # Stable date order, then the last row per key is its latest as_of_date.
+    key_cols = ["window_days", "section", "metric_key"]
+    as_of_dt = _as_of_dates(history_df["as_of_date"])
+    valid = as_of_dt.notna().to_numpy()
+    order = np.argsort(as_of_dt[valid].to_numpy(), kind="stable")
+    out = (
+        history_df.loc[valid]
+        .iloc[order]
+        .drop_duplicates(subset=key_cols, keep="last")
+        .sort_values(by=key_cols)
+        .reset_index(drop=True)
+    )
+    out = _shrink_history(out)
+    write_csv_with_parquet(out, output_csv)
     return out
 
 
@@ -96,83 +195,54 @@ def build_windowed_serving_snapshot(
     """
     output_csv.parent.mkdir(parents=True, exist_ok=True)
     if history_df.empty:
-        out = pd.DataFrame(
-            columns=[
-                "as_of_date",
-                "window_days",
-                "section",
-                "metric_key",
-                "metric_label",
-                "value",
-                "value_type",
-                "source",
-                "status",
-                "lower_threshold",
-                "upper_threshold",
-                "pct_change",
-                "seasonal_zscore",
-                "signal_count",
-                "signals",
-                "rolling_points_used",
-                "seasonal_points_used",
-                "weekday_filter_applied",
-                "refreshed_at",
-            ]
-        )
-        out.to_csv(output_csv, index=False)
+        out = pd.DataFrame(columns=list(WINDOWED_SNAPSHOT_COLUMNS))
+        write_csv_with_parquet(out, output_csv)
         return out
 
-    df = history_df.copy()
-    df["as_of_date"] = pd.to_datetime(df["as_of_date"], errors="coerce")
-    df = df[df["as_of_date"].notna()]
-    df = df[df["window_days"] == 1]
-    if df.empty:
-        out = pd.DataFrame(
-            columns=[
-                "as_of_date",
-                "window_days",
-                "section",
-                "metric_key",
-                "metric_label",
-                "value",
-                "value_type",
-                "source",
-                "status",
-                "lower_threshold",
-                "upper_threshold",
-                "pct_change",
-                "seasonal_zscore",
-                "signal_count",
-                "signals",
-                "rolling_points_used",
-                "seasonal_points_used",
-                "weekday_filter_applied",
-                "refreshed_at",
-            ]
-        )
-        out.to_csv(output_csv, index=False)
+    as_of_dt = _as_of_dates(history_df["as_of_date"])
+    daily = (as_of_dt.notna() & (history_df["window_days"] == 1)).to_numpy()
+    if not daily.any():
+        out = pd.DataFrame(columns=list(WINDOWED_SNAPSHOT_COLUMNS))
+        write_csv_with_parquet(out, output_csv)
         return out
 
     out_rows: list[dict] = []
     group_cols = ["section", "metric_key"]
-    for (_, _), g in df.groupby(group_cols):
-        # Safety dedupe by parsed day inside each metric group to prevent
-        # double-counting if historical rows were ingested with mixed date formats.
-        g = g.sort_values("as_of_date").drop_duplicates(subset=["as_of_date"], keep="last").reset_index(drop=True)
+    # Safety dedupe by parsed day inside each metric group to prevent
+    # double-counting if historical rows were ingested with mixed date formats.
+    # The metric keys are grouped on several times below; categorical codes
+    # make each pass an integer groupby (observed=True skips empty combos).
+    df = (
+        history_df.loc[daily]
+        .assign(as_of_date=as_of_dt[daily], value=lambda d: pd.to_numeric(d["value"], errors="coerce"))
+        .astype({c: "category" for c in group_cols})
+        .sort_values([*group_cols, "as_of_date"], kind="mergesort")
+        .drop_duplicates(subset=[*group_cols, "as_of_date"], keep="last")
+    )
+    group_keys = [df[c] for c in group_cols]
+    latest_dates = df.groupby(group_keys, sort=False, observed=True)["as_of_date"].transform("max")
+
+    # Window rollups for every metric at once: mask rows outside each window,
+    # then one grouped sum (counts) and mean (rates) per window.
+    window_sums: dict[int, dict] = {}
+    window_means: dict[int, dict] = {}
+    for window in windows:
+        in_window = df["value"].where(df["as_of_date"] >= latest_dates - pd.Timedelta(days=window - 1))
+        by_metric = in_window.groupby(group_keys, sort=False, observed=True)
+        window_sums[window] = by_metric.sum().to_dict()
+        window_means[window] = by_metric.mean().to_dict()
+
+    refreshed_at = datetime.utcnow().isoformat(timespec="seconds")
+    for key, g in df.groupby(group_cols, sort=False, observed=True):
         latest = g.iloc[-1]
         latest_date = latest["as_of_date"]
         value_type = str(latest.get("value_type", "count")).lower()
 
         for window in windows:
-            start_date = latest_date - pd.Timedelta(days=window - 1)
-            subset = g[g["as_of_date"] >= start_date]
-            if subset.empty:
-                continue
-
             if value_type == "count":
-                value = float(pd.to_numeric(subset["value"], errors="coerce").fillna(0).sum())
+                value = float(window_sums[window][key])
             else:
-                value = float(pd.to_numeric(subset["value"], errors="coerce").dropna().mean())
+                value = float(window_means[window][key])
 
             threshold_result = evaluate_thresholds_for_window(
                 daily_df=g[["as_of_date", "value"]],
@@ -201,38 +271,16 @@ def build_windowed_serving_snapshot(
                     "rolling_points_used": threshold_result.rolling_points_used,
                     "seasonal_points_used": threshold_result.seasonal_points_used,
                     "weekday_filter_applied": threshold_result.weekday_filter_applied,
-                    "refreshed_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "refreshed_at": refreshed_at,
                 }
             )
 
     out = pd.DataFrame(out_rows)
     if out.empty:
-        out = pd.DataFrame(
-            columns=[
-                "as_of_date",
-                "window_days",
-                "section",
-                "metric_key",
-                "metric_label",
-                "value",
-                "value_type",
-                "source",
-                "status",
-                "lower_threshold",
-                "upper_threshold",
-                "pct_change",
-                "seasonal_zscore",
-                "signal_count",
-                "signals",
-                "rolling_points_used",
-                "seasonal_points_used",
-                "weekday_filter_applied",
-                "refreshed_at",
-            ]
-        )
+        out = pd.DataFrame(columns=list(WINDOWED_SNAPSHOT_COLUMNS))
     else:
-        out = out.sort_values(by=["section", "metric_key", "window_days"]).reset_index(drop=True)
-    out.to_csv(output_csv, index=False)
+        out = _shrink_history(out.sort_values(by=["section", "metric_key", "window_days"]).reset_index(drop=True))
+    write_csv_with_parquet(out, output_csv)
     return out
 
 
@@ -249,38 +297,37 @@ def apply_history_retention(
     if history_df.empty or retention_days <= 0:
         return history_df
 
-    df = history_df.copy()
-    df["as_of_date_dt"] = pd.to_datetime(df["as_of_date"], errors="coerce")
-    df = df[df["as_of_date_dt"].notna()].copy()
-    if df.empty:
+    # Masks over the parsed dates select rows directly; NaT rows fall in neither.
+    as_of_dt = _as_of_dates(history_df["as_of_date"])
+    if not as_of_dt.notna().any():
         return history_df
 
-    max_date = df["as_of_date_dt"].max()
+    max_date = as_of_dt.max()
     cutoff = max_date - pd.Timedelta(days=retention_days - 1)
-    keep_df = df[df["as_of_date_dt"] >= cutoff].copy()
-    archive_df = df[df["as_of_date_dt"] < cutoff].copy()
+    keep_mask = (as_of_dt >= cutoff).to_numpy()
+    archive_mask = (as_of_dt < cutoff).to_numpy()
 
     # Archive by month if requested
-    if archive_dir is not None and not archive_df.empty:
+    if archive_dir is not None and archive_mask.any():
         archive_dir.mkdir(parents=True, exist_ok=True)
-        archive_df["year_month"] = archive_df["as_of_date_dt"].dt.strftime("%Y_%m")
-        for ym, group in archive_df.groupby("year_month"):
-            target = archive_dir / f"kpi_history_{ym}.csv"
-            out_group = group.drop(columns=["year_month"])
-            if target.exists():
-                old = pd.read_csv(target)
-                merged = pd.concat([old, out_group.drop(columns=["as_of_date_dt"])], ignore_index=True)
+        archive_df = history_df.loc[archive_mask]
+        archive_dt = as_of_dt[archive_mask]
+        # Integer yyyymm keys; the file name is formatted once per month.
+        year_month = archive_dt.dt.year.to_numpy() * 100 + archive_dt.dt.month.to_numpy()
+        for ym, group in archive_df.groupby(year_month):
+            target = archive_dir / f"kpi_history_{ym // 100}_{ym % 100:02d}.csv"
+            old = read_frame(target)
+            if old is not None:
+                merged = pd.concat([old, group], ignore_index=True)
                 merged = merged.drop_duplicates(
                     subset=["as_of_date", "window_days", "section", "metric_key"], keep="last"
                 )
             else:
-                merged = out_group.drop(columns=["as_of_date_dt"])
+                merged = group
             merged = merged.sort_values(by=["as_of_date", "section", "metric_key", "window_days"]).reset_index(drop=True)
-            merged.to_csv(target, index=False)
+            write_csv_with_parquet(merged, target)
 
-    keep_out = keep_df.drop(columns=["as_of_date_dt"]).copy()
+    keep_out = history_df.loc[keep_mask]
     keep_out = keep_out.sort_values(by=["as_of_date", "section", "metric_key", "window_days"]).reset_index(drop=True)
-    history_csv.parent.mkdir(parents=True, exist_ok=True)
-    keep_out.to_csv(history_csv, index=False)
+    write_csv_with_parquet(keep_out, history_csv)
     return keep_out
-
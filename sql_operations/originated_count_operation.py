@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from functools import lru_cache, partial
 from pathlib import Path
 
 import pandas as pd
 
 from DatabaseConnections.ConnectToLMSMaster import ConnectToLMSMaster
+from scripts.frame_io import write_frame
 from scripts.logging_utils import setup_logger
 
 LOGGER = setup_logger(__name__, "originated_count_operation")
@@ -15,6 +18,14 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 OUTPUT_DIR = REPO_ROOT / "data" / "refresh"
 
 STORED_PROCEDURE = "EXEC USP_SystemAlert_ConversionRateProcedure ?, ?, ?"
+# Upper bound on concurrent raw result-set dumps.
+MAX_PARALLEL_WRITES = 6
+
+
+@lru_cache(maxsize=None)
+def _get_connector(database: str = "LMSMaster") -> ConnectToLMSMaster:
+    """Connector reused across the ConversionRate calls of one run."""
+    return ConnectToLMSMaster(database=database)
 
 
 def _find_column(columns: list[str], candidates: list[str]) -> str | None:
@@ -35,29 +46,39 @@ def _originated_cols(df: pd.DataFrame) -> list[str]:
     return cols
 
 
-def _originated_new_col(df: pd.DataFrame) -> str | None:
+def _originated_new_col(originated_cols: list[str]) -> str | None:
     """
     Legacy parity: prefer NEW-customer originated column.
-    Falls back to None if not found.
+    Picked from the already-detected originated columns (the NEW column is one
+    of them); falls back to None if not found.
     """
-    for c in df.columns:
-        name = str(c).strip().lower()
-        if "originated loans for new customers" in name:
-            return str(c)
+    for c in originated_cols:
+        if "originated loans for new customers" in c.strip().lower():
+            return c
     return None
 
 
 def fetch_originated_count_result_sets(start_num: int = 1, end_num: int = 1, days: int = 90) -> list[pd.DataFrame]:
-    dbconnector = ConnectToLMSMaster(database="LMSMaster")
+    dbconnector = _get_connector()
     return dbconnector.callStoredProcedure(STORED_PROCEDURE, start_num, end_num, days)
 
 
-def run_originated_count(start_num: int = 1, end_num: int = 1, days: int = 90) -> list[Path]:
+def daily_proc_params(days: int) -> tuple[int, int, int]:
+    """(start_num, end_num, days) the daily backfill/summary call the proc with."""
+    n = max(days, 1)
+    return n, 1, n
+
+
+def run_originated_count(
+    start_num: int = 1, end_num: int = 1, days: int = 90, result_sets: list[pd.DataFrame] | None = None
+) -> list[Path]:
     """
     Execute ConversionRate stored procedure and persist all result sets.
+    Pass `result_sets` from an earlier fetch to skip executing the proc again.
     Returns written file paths.
     """
-    result_sets = fetch_originated_count_result_sets(start_num=start_num, end_num=end_num, days=days)
+    if result_sets is None:
+        result_sets = fetch_originated_count_result_sets(start_num=start_num, end_num=end_num, days=days)
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     outputs = [
@@ -69,25 +90,31 @@ def run_originated_count(start_num: int = 1, end_num: int = 1, days: int = 90) -
         OUTPUT_DIR / "conversion_rate_accepted_daily_by_custtype.csv",
     ]
 
-    written: list[Path] = []
-    for idx, df in enumerate(result_sets):
-        target = outputs[idx] if idx < len(outputs) else OUTPUT_DIR / f"conversion_rate_result_set_{idx + 1}.csv"
-        df.to_csv(target, index=False)
-        LOGGER.info("Wrote %s (%d rows)", target, len(df))
-        written.append(target)
-
-    if not written:
+    if not result_sets:
         raise RuntimeError("ConversionRate stored procedure returned no result sets.")
+
+    targets = [
+        outputs[idx] if idx < len(outputs) else OUTPUT_DIR / f"conversion_rate_result_set_{idx + 1}.csv"
+        for idx in range(len(result_sets))
+    ]
+    # The dumps are independent files; overlap their writes.
+    with ThreadPoolExecutor(max_workers=min(len(result_sets), MAX_PARALLEL_WRITES)) as pool:
+        written = list(pool.map(partial(write_frame, fmt="csv"), result_sets, targets))
+    for target, df in zip(written, result_sets):
+        LOGGER.info("Wrote %s (%d rows)", target, len(df))
     return written
 
 
-def summarize_originated_count_from_proc(start_num: int = 1, end_num: int = 1, days: int = 90) -> dict:
+def summarize_originated_count_from_proc(
+    start_num: int = 1, end_num: int = 1, days: int = 90, result_sets: list[pd.DataFrame] | None = None
+) -> dict:
     """
     Return latest daily Originated Count from proc output.
     Uses the daily originated-by-custtype result set and picks latest day < today,
     then sums NEW/RTG/RTO for that day.
+    `result_sets`, if given, must come from the `daily_proc_params(max(days, 2))` call.
     """
-    daily_df = backfill_originated_count_daily_from_proc(days=max(days, 2))
+    daily_df = backfill_originated_count_daily_from_proc(days=max(days, 2), result_sets=result_sets)
     if daily_df.empty:
         raise RuntimeError("Could not find daily originated result set in ConversionRate procedure output.")
     latest = daily_df.iloc[-1]
@@ -98,38 +125,39 @@ def summarize_originated_count_from_proc(start_num: int = 1, end_num: int = 1, d
     }
 
 
-def backfill_originated_count_daily_from_proc(days: int = 90) -> pd.DataFrame:
+def backfill_originated_count_daily_from_proc(
+    days: int = 90, result_sets: list[pd.DataFrame] | None = None
+) -> pd.DataFrame:
     """
     Build daily OriginatedCount history from proc daily result set.
     OriginatedCount is NEW + RTG + RTO originated counts per day.
+    `result_sets`, if given, must come from the `daily_proc_params(days)` call.
     """
-    result_sets = fetch_originated_count_result_sets(start_num=max(days, 1), end_num=1, days=max(days, 1))
+    if result_sets is None:
+        result_sets = fetch_originated_count_result_sets(*daily_proc_params(days))
     if not result_sets:
         return pd.DataFrame()
 
+    # Scan each result set's columns once and keep what was found.
     daily_df: pd.DataFrame | None = None
+    date_col: str | None = None
+    originated_cols: list[str] = []
     for df in result_sets:
         if df.empty:
             continue
-        cols = _originated_cols(df)
+        originated_cols = _originated_cols(df)
         date_col = _find_column(list(df.columns), ["ApplicationDate"])
-        if cols and date_col is not None:
+        if originated_cols and date_col is not None:
             daily_df = df.copy()
             break
 
-    if daily_df is None or daily_df.empty:
+    if daily_df is None or date_col is None:
         return pd.DataFrame()
 
-    date_col = _find_column(list(daily_df.columns), ["ApplicationDate"])
-    if date_col is None:
-        return pd.DataFrame()
-
-    new_col = _originated_new_col(daily_df)
-    originated_cols = _originated_cols(daily_df)
-    if new_col is None and not originated_cols:
-        return pd.DataFrame()
+    new_col = _originated_new_col(originated_cols)
 
-    daily_df["as_of_date"] = pd.to_datetime(daily_df[date_col], errors="coerce").dt.date
+    # Stay in datetime64 (midnight) end to end; formatting happens once at the end.
+    daily_df["as_of_date"] = pd.to_datetime(daily_df[date_col], errors="coerce").dt.normalize()
     daily_df = daily_df[daily_df["as_of_date"].notna()].copy()
     if daily_df.empty:
         return pd.DataFrame()
@@ -139,10 +167,11 @@ def backfill_originated_count_daily_from_proc(days: int = 90) -> pd.DataFrame:
     if new_col is not None:
         daily_df["OriginatedCount"] = pd.to_numeric(daily_df[new_col], errors="coerce").fillna(0.0)
     else:
-        total_series = pd.Series(0.0, index=daily_df.index)
-        for c in originated_cols:
-            total_series = total_series + pd.to_numeric(daily_df[c], errors="coerce").fillna(0.0)
-        daily_df["OriginatedCount"] = total_series
+        block = daily_df[originated_cols]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+            block = block.apply(pd.to_numeric, errors="coerce")
+        # One row-wise reduction over the 2-D block; missing counts add as 0.
+        daily_df["OriginatedCount"] = block.to_numpy(dtype="float64", na_value=0.0).sum(axis=1)
 
     out = (
         daily_df.groupby("as_of_date", as_index=False)["OriginatedCount"]
@@ -150,10 +179,8 @@ def backfill_originated_count_daily_from_proc(days: int = 90) -> pd.DataFrame:
         .sort_values("as_of_date")
         .reset_index(drop=True)
     )
-    out["as_of_date"] = pd.to_datetime(out["as_of_date"], errors="coerce").dt.date
-    today = date.today()
-    out = out[out["as_of_date"] < today].copy()
-    out["as_of_date"] = out["as_of_date"].astype(str)
+    out = out[out["as_of_date"] < pd.Timestamp(date.today())].copy()
+    out["as_of_date"] = out["as_of_date"].dt.strftime("%Y-%m-%d")
     out["OriginatedCount"] = pd.to_numeric(out["OriginatedCount"], errors="coerce").fillna(0).astype(int)
     return out
 
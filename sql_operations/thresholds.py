@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from scripts.controller import get_thresholds, threshold_mode
@@ -56,41 +57,49 @@ def _status_from_signal_count(signal_count: int, policy: dict[str, Any] | None)
     return "Green"
 
 
-def _parse_excluded_weekdays(raw: Any) -> set[int]:
+_WEEKDAY_MAP = {
+    "mon": 0,
+    "monday": 0,
+    "tue": 1,
+    "tues": 1,
+    "tuesday": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "thu": 3,
+    "thur": 3,
+    "thurs": 3,
+    "thursday": 3,
+    "fri": 4,
+    "friday": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sun": 6,
+    "sunday": 6,
+}
+
+
+def _parse_excluded_weekdays(raw: Any) -> frozenset[int]:
     """
     Parse weekday exclusions from config.
     Supports: ["sun"], ["mon", "sun"], [0, 6], mixed forms.
     """
     if not isinstance(raw, list):
-        return set()
-    mapping = {
-        "mon": 0,
-        "monday": 0,
-        "tue": 1,
-        "tues": 1,
-        "tuesday": 1,
-        "wed": 2,
-        "wednesday": 2,
-        "thu": 3,
-        "thur": 3,
-        "thurs": 3,
-        "thursday": 3,
-        "fri": 4,
-        "friday": 4,
-        "sat": 5,
-        "saturday": 5,
-        "sun": 6,
-        "sunday": 6,
-    }
+        return frozenset()
     out: set[int] = set()
     for item in raw:
         if isinstance(item, int) and 0 <= item <= 6:
             out.add(item)
             continue
         key = str(item).strip().lower()
-        if key in mapping:
-            out.add(mapping[key])
-    return out
+        if key in _WEEKDAY_MAP:
+            out.add(_WEEKDAY_MAP[key])
+    return frozenset(out)
+
+
+def _window_value(values: np.ndarray, end: int, window_days: int, is_count: bool) -> float | None:
+    """Sum (counts) or mean (rates) of the `window_days` points ending before `end`."""
+    window = values[max(end - window_days, 0) : end]
+    return _safe_float(window.sum() if is_count else window.mean())
 
 
 def evaluate_thresholds_for_window(
@@ -108,7 +117,9 @@ def evaluate_thresholds_for_window(
         return ThresholdResult("Yellow", None, None, None, None, 0, "", 0, 0, False)
 
     df = daily_df.copy()
-    df["as_of_date"] = pd.to_datetime(df["as_of_date"], errors="coerce")
+    if not pd.api.types.is_datetime64_any_dtype(df["as_of_date"]):
+        # Snapshot builders pass already-parsed days; only parse raw input.
+        df["as_of_date"] = pd.to_datetime(df["as_of_date"], errors="coerce")
     df["value"] = pd.to_numeric(df["value"], errors="coerce")
     df = df[df["as_of_date"].notna() & df["value"].notna()].sort_values("as_of_date")
     if df.empty:
@@ -122,19 +133,28 @@ def evaluate_thresholds_for_window(
     excluded_weekdays = _parse_excluded_weekdays(dyn_cfg.get("exclude_weekdays"))
     weekday_filter_applied = bool(excluded_weekdays)
     if excluded_weekdays:
-        df = df[~df["as_of_date"].dt.dayofweek.isin(excluded_weekdays)]
+        # Seven-slot lookup table indexed by dayofweek: one gather per row.
+        excluded_mask = np.zeros(7, dtype=bool)
+        excluded_mask[list(excluded_weekdays)] = True
+        df = df[~excluded_mask[df["as_of_date"].dt.dayofweek.to_numpy()]]
         if df.empty:
             return ThresholdResult("Yellow", None, None, None, None, 0, "", 0, 0, True)
 
-    # Build x_t series for selected window (after weekday exclusion, if configured).
-    if str(value_type).lower() == "count":
-        x_series = df["value"].rolling(window=window_days, min_periods=1).sum()
+    is_count = str(value_type).lower() == "count"
+    if mode == "dynamic":
+        # Build x_t series for selected window (after weekday exclusion, if configured).
+        if is_count:
+            x_series = df["value"].rolling(window=window_days, min_periods=1).sum()
+        else:
+            x_series = df["value"].rolling(window=window_days, min_periods=1).mean()
+        x_series.index = df["as_of_date"]
+        x_t = _safe_float(x_series.iloc[-1])
+        x_prev = _safe_float(x_series.iloc[-2]) if len(x_series) >= 2 else None
     else:
-        x_series = df["value"].rolling(window=window_days, min_periods=1).mean()
-    x_series.index = df["as_of_date"]
-
-    x_t = _safe_float(x_series.iloc[-1])
-    x_prev = _safe_float(x_series.iloc[-2]) if len(x_series) >= 2 else None
+        # Static mode only needs the last two window values, not the whole series.
+        values = df["value"].to_numpy(dtype="float64")
+        x_t = _window_value(values, len(values), window_days, is_count)
+        x_prev = _window_value(values, len(values) - 1, window_days, is_count) if len(values) >= 2 else None
     pct_change = None
     if x_t is not None and x_prev not in (None, 0):
         pct_change = (x_t - x_prev) / x_prev
@@ -163,21 +183,24 @@ def evaluate_thresholds_for_window(
         min_history_points = int(dyn.get("min_history_points", max(rolling_window, 10)))
         min_seasonal_points = int(dyn.get("min_seasonal_points", 5))
 
-        if len(x_series) >= min_history_points:
-            r_mean = x_series.rolling(window=rolling_window, min_periods=rolling_window).mean().iloc[-1]
-            r_std = x_series.rolling(window=rolling_window, min_periods=rolling_window).std(ddof=0).iloc[-1]
-            r_mean_f = _safe_float(r_mean)
-            r_std_f = _safe_float(r_std)
+        if len(x_series) >= min_history_points and 0 < rolling_window <= len(x_series):
+            # Only the last full window is used, so reduce that slice directly
+            # rather than sweeping rolling mean/std over the whole series.
+            tail = x_series.to_numpy(dtype="float64")[-rolling_window:]
+            r_mean_f = _safe_float(tail.mean())
+            r_std_f = _safe_float(tail.std())
             if r_mean_f is not None and r_std_f is not None:
                 lower_threshold = r_mean_f - (k * r_std_f)
                 upper_threshold = r_mean_f + (k * r_std_f)
                 rolling_points_used = min(len(x_series), rolling_window)
 
         # Seasonal z-score by month-day, using prior years if available.
-        latest_date = x_series.index[-1]
-        md = latest_date.strftime("%m-%d")
-        seasonal_hist = x_series[x_series.index.strftime("%m-%d") == md]
-        seasonal_hist = seasonal_hist[seasonal_hist.index < latest_date]
+        # Month-day keys as integers (month * 100 + day): no per-row strftime.
+        dates = x_series.index
+        latest_date = dates[-1]
+        md_keys = dates.month.to_numpy() * 100 + dates.day.to_numpy()
+        seasonal_mask = (md_keys == latest_date.month * 100 + latest_date.day) & (dates < latest_date)
+        seasonal_hist = x_series[seasonal_mask]
         seasonal_points_used = int(len(seasonal_hist))
         if len(seasonal_hist) >= min_seasonal_points:
             s_mean = _safe_float(seasonal_hist.mean())